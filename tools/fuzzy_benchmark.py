@@ -0,0 +1,82 @@
+# SPDX-FileCopyrightText: 2025 David Mandelberg <david@mandelberg.org>
+#
+# SPDX-License-Identifier: Apache-2.0
+"""Benchmark for fuzzy search over the full map.
+
+Example:
+    python -m unimnim.main --write-all=/tmp/unimnim
+    python tools/fuzzy_benchmark.py --output-dir=/tmp/unimnim
+"""
+
+import argparse
+import json
+import pathlib
+import random
+import statistics
+import time
+
+from unimnim import fuzzy
+from unimnim import runtime
+
+
+def _typo(mnemonic: str, *, keys: str, rng: random.Random) -> str:
+    """Returns mnemonic with one typical typo."""
+    i = rng.randrange(len(mnemonic))
+    match rng.choice(("delete", "insert", "substitute", "transpose")):
+        case "delete":
+            return mnemonic[:i] + mnemonic[i + 1 :]
+        case "insert":
+            return mnemonic[:i] + rng.choice(keys) + mnemonic[i:]
+        case "substitute":
+            return mnemonic[:i] + rng.choice(keys) + mnemonic[i + 1 :]
+        case "transpose":
+            if i == len(mnemonic) - 1:
+                return mnemonic
+            return (
+                mnemonic[:i] + mnemonic[i + 1] + mnemonic[i] + mnemonic[i + 2 :]
+            )
+    raise AssertionError()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--output-dir",
+        type=pathlib.Path,
+        required=True,
+        help="Directory that was used with --write-all.",
+    )
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    map_ = json.loads((args.output_dir / "map.json").read_text())
+    start = time.perf_counter()
+    trie = runtime.Trie.build(map_)
+    print(f"trie: {len(trie)} nodes in {time.perf_counter() - start:.3f} s")
+    keys = "".join(sorted(frozenset("".join(map_))))
+    mnemonics = sorted(mnemonic for mnemonic in map_ if mnemonic)
+    queries = [
+        _typo(rng.choice(mnemonics), keys=keys, rng=rng)
+        for _ in range(args.queries)
+    ]
+    for max_distance in (1, 2):
+        latencies = list[float]()
+        match_counts = list[int]()
+        for query in queries:
+            start = time.perf_counter()
+            matches = fuzzy.search(trie, query, max_distance=max_distance)
+            latencies.append(time.perf_counter() - start)
+            match_counts.append(len(matches))
+        quantiles = statistics.quantiles(latencies, n=100)
+        print(
+            f"max_distance={max_distance}: "
+            f"p50={quantiles[49] * 1e3:.3f} ms "
+            f"p99={quantiles[98] * 1e3:.3f} ms "
+            f"max={max(latencies) * 1e3:.3f} ms "
+            f"mean_matches={statistics.mean(match_counts):.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
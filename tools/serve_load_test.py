@@ -0,0 +1,104 @@
+# SPDX-FileCopyrightText: 2025 David Mandelberg <david@mandelberg.org>
+#
+# SPDX-License-Identifier: Apache-2.0
+"""Load test for a running `unimnim serve` instance.
+
+Example:
+    python -m unimnim.main --write-all=/tmp/unimnim
+    python -m unimnim.main serve --output-dir=/tmp/unimnim \
+        --socket=/tmp/unimnim.sock &
+    python tools/serve_load_test.py --socket=/tmp/unimnim.sock \
+        --output-dir=/tmp/unimnim
+"""
+
+import argparse
+import asyncio
+import json
+import pathlib
+import random
+import statistics
+import time
+from typing import Any
+
+
+def _requests(output_dir: pathlib.Path, *, seed: int) -> list[Any]:
+    """Returns a realistic mix of requests, using the generated map."""
+    rng = random.Random(seed)
+    map_ = json.loads((output_dir / "map.json").read_text())
+    mnemonics = sorted(map_)
+    results = sorted(frozenset(map_.values()))
+    requests = list[Any]()
+    for _ in range(1000):
+        mnemonic = rng.choice(mnemonics)
+        requests.extend(
+            (
+                {"op": "exact", "mnemonic": mnemonic},
+                {"op": "exact", "mnemonic": mnemonic},
+                {"op": "exact", "mnemonic": mnemonic},
+                {"op": "prefix", "prefix": mnemonic[:2], "limit": 20},
+                {"op": "reverse", "result": rng.choice(results)},
+            )
+        )
+    requests.extend(
+        {"op": "search", "query": query}
+        for query in ("acute", "small a", "greek alpha", "arrow")
+    )
+    rng.shuffle(requests)
+    return requests
+
+
+async def _client(
+    socket_path: pathlib.Path,
+    requests: list[Any],
+    latencies: list[float],
+) -> None:
+    reader, writer = await asyncio.open_unix_connection(socket_path)
+    try:
+        for request in requests:
+            start = time.perf_counter()
+            writer.write(json.dumps(request).encode() + b"\n")
+            await writer.drain()
+            response = json.loads(await reader.readline())
+            latencies.append(time.perf_counter() - start)
+            if "error" in response:
+                raise ValueError(f"{request!r} failed: {response!r}")
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+async def _main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--socket", type=pathlib.Path, required=True)
+    parser.add_argument(
+        "--output-dir",
+        type=pathlib.Path,
+        required=True,
+        help="Directory the server is using, to pick requests from.",
+    )
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    requests = _requests(args.output_dir, seed=args.seed)
+    latencies = list[float]()
+    start = time.perf_counter()
+    async with asyncio.TaskGroup() as task_group:
+        for client in range(args.clients):
+            task_group.create_task(
+                _client(
+                    args.socket,
+                    requests[client :: args.clients],
+                    latencies,
+                )
+            )
+    elapsed = time.perf_counter() - start
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(f"requests: {len(latencies)}")
+    print(f"throughput: {len(latencies) / elapsed:.0f} requests/s")
+    print(f"p50: {quantiles[49] * 1e3:.3f} ms")
+    print(f"p99: {quantiles[98] * 1e3:.3f} ms")
+    print(f"max: {max(latencies) * 1e3:.3f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -1,3 +1,25 @@
 # SPDX-FileCopyrightText: 2025 David Mandelberg <david@mandelberg.org>
 #
 # SPDX-License-Identifier: Apache-2.0
+"""UNIcode MNemonic Input Method."""
+
+import typing
+from typing import Any
+
+if typing.TYPE_CHECKING:
+    from unimnim.api import build
+    from unimnim.api import BuildContext
+    from unimnim.api import BuildResult
+    from unimnim.api import packaged_sources
+
+__all__ = ("BuildContext", "BuildResult", "build", "packaged_sources")
+
+
+def __getattr__(name: str) -> Any:
+    # Importing any submodule imports this package first, so the API is only
+    # imported when it's used, to keep other submodules lightweight.
+    if name in __all__:
+        from unimnim import api
+
+        return getattr(api, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
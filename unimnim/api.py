@@ -0,0 +1,196 @@
+# SPDX-FileCopyrightText: 2025 David Mandelberg <david@mandelberg.org>
+#
+# SPDX-License-Identifier: Apache-2.0
+"""Library API for building input methods in memory."""
+
+from collections.abc import Mapping, Sequence
+import dataclasses
+from importlib import resources
+import tomllib
+from typing import Any
+
+from unimnim import coverage
+from unimnim import data
+from unimnim import input_method
+
+
+def packaged_sources() -> Mapping[str, str]:
+    """Returns the contents of the data files that come with unimnim.
+
+    Returns:
+        Map from group ID to the contents of its data file, sorted by group ID.
+        This can be modified and passed to build() to build a customized input
+        method.
+    """
+    with resources.as_file(
+        resources.files("unimnim").joinpath("data")
+    ) as data_path:
+        return {
+            str(file.relative_to(data_path)).removesuffix(".toml"): (
+                file.read_text()
+            )
+            for file in sorted(
+                data_path.glob("**/*.toml"),
+                key=lambda file: str(file.relative_to(data_path)),
+            )
+        }
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class BuildResult:
+    """Input method built by build().
+
+    Attributes:
+        groups: Map from group ID to the group's data, sorted by group ID.
+        group_maps: Map from group ID to the group's map from mnemonic to
+            result.
+        map: Map from mnemonic to result, for all groups.
+        prefix_map: Map from each prefix of a mnemonic to the results of all
+            mnemonics with that prefix.
+        m17n_mim: m17n input method.
+        coverage: Coverage report, see coverage.report().
+    """
+
+    groups: Mapping[str, data.Group]
+    group_maps: Mapping[str, Mapping[str, str]]
+    map: Mapping[str, str]
+    prefix_map: Mapping[str, Sequence[str]]
+    m17n_mim: str
+    coverage: Any
+
+
+class BuildContext:
+    """State to reuse between calls to build().
+
+    Parsed code points are cached for the whole process, and so are known
+    sequences and the indexes that combining and coverage use, for the last
+    input_method.KNOWN_SEQUENCES_CACHE_SIZE sets of scripts. Those stay warm
+    between builds regardless of the context. The context additionally keeps
+    the latest parsed data and generated map of each group, so that building
+    again only parses and evaluates the groups that changed. It keeps one
+    version of each group ID that it has seen, so it grows with the number of
+    distinct group IDs, not with the number of builds.
+
+    This is not thread-safe.
+    """
+
+    def __init__(self) -> None:
+        self._parsed = dict[str, tuple[str, data.Group]]()
+        self._group_maps = dict[
+            str,
+            tuple[data.Group, frozenset[str] | None, Mapping[str, str]],
+        ]()
+
+    def parse(self, group_id: str, source: str) -> data.Group:
+        """Returns the group parsed from the contents of a data file."""
+        if (parsed := self._parsed.get(group_id)) is not None:
+            parsed_source, group = parsed
+            if parsed_source == source:
+                return group
+        group = data.Group.parse(tomllib.loads(source), group_id=group_id)
+        self._parsed[group_id] = (source, group)
+        return group
+
+    def group_maps(
+        self,
+        groups: Mapping[str, data.Group],
+        *,
+        known_sequence_scripts: frozenset[str] | None,
+    ) -> Mapping[str, Mapping[str, str]]:
+        """Returns input_method.generate_group_maps(), reusing old maps."""
+        changed_groups = {}
+        for group_id, group in groups.items():
+            previous = self._group_maps.get(group_id)
+            if previous is None or previous[:2] != (
+                group,
+                known_sequence_scripts,
+            ):
+                changed_groups[group_id] = group
+        for group_id, group_map in input_method.generate_group_maps(
+            changed_groups,
+            known_sequence_scripts=known_sequence_scripts,
+        ).items():
+            self._group_maps[group_id] = (
+                changed_groups[group_id],
+                known_sequence_scripts,
+                group_map,
+            )
+        return {group_id: self._group_maps[group_id][2] for group_id in groups}
+
+
+def _known_sequence_scripts(
+    groups: Mapping[str, str | data.Group],
+) -> frozenset[str] | None:
+    """Returns input_method.known_sequence_scripts() for data to build."""
+    # Restricting the known sequences to scripts is only known to give the same
+    # results for the packaged data, so other data uses all known sequences.
+    packaged = packaged_sources()
+    if any(
+        packaged.get(group_id) != source for group_id, source in groups.items()
+    ):
+        return None
+    return input_method.known_sequence_scripts(groups)
+
+
+def build(
+    groups: Mapping[str, str | data.Group],
+    *,
+    context: BuildContext | None = None,
+    m17n_name: str = "unimnim",
+) -> BuildResult:
+    """Builds an input method without reading or writing any files.
+
+    Args:
+        groups: Map from group ID to either the contents of its data file,
+            e.g., from packaged_sources(), or already parsed data.
+        context: Context to reuse from previous builds, or None to use a new
+            one.
+        m17n_name: Name of the m17n input method.
+
+    Returns:
+        The input method.
+
+    Raises:
+        ExceptionGroup: At least one group failed to parse. It contains the
+            errors from all groups, each with a note saying which group.
+        ValueError: The groups are invalid together, e.g., they have
+            duplicate mnemonics.
+    """
+    if context is None:
+        context = BuildContext()
+    parsed_groups = {}
+    errors = []
+    for group_id in sorted(groups):
+        group = groups[group_id]
+        try:
+            parsed_groups[group_id] = (
+                context.parse(group_id, group)
+                if isinstance(group, str)
+                else group
+            )
+        except Exception as e:
+            e.add_note(f"While parsing group {group_id!r}")
+            errors.append(e)
+    if errors:
+        raise ExceptionGroup("Failed to parse groups", errors)
+    known_sequence_scripts = _known_sequence_scripts(groups)
+    group_maps = context.group_maps(
+        parsed_groups, known_sequence_scripts=known_sequence_scripts
+    )
+    map_ = input_method.merge_group_maps(group_maps)
+    prefix_map = input_method.generate_prefix_map(map_)
+    return BuildResult(
+        groups=parsed_groups,
+        group_maps=group_maps,
+        map=map_,
+        prefix_map=prefix_map,
+        m17n_mim=input_method.render_m17n(
+            map_=map_,
+            prefix_map=prefix_map,
+            name=m17n_name,
+        ),
+        coverage=coverage.report(
+            covered=frozenset(map_.values()),
+            known_sequence_scripts=known_sequence_scripts,
+        ),
+    )
@@ -0,0 +1,107 @@
+# SPDX-FileCopyrightText: 2025 David Mandelberg <david@mandelberg.org>
+#
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+import pathlib
+
+import pytest
+
+import unimnim
+from unimnim import coverage
+from unimnim import data
+from unimnim import input_method
+from unimnim import main
+
+_TEST_GROUP = """
+    prefix = "t"
+    [maps.main]
+    "a" = "U+0061 LATIN SMALL LETTER A"
+    "b" = "U+0062 LATIN SMALL LETTER B"
+    [expressions]
+    main = ["map", "main"]
+"""
+
+
+def test_build() -> None:
+    result = unimnim.build({"test": _TEST_GROUP})
+
+    assert tuple(result.groups) == ("test",)
+    assert result.group_maps == {"test": {"ta": "a", "tb": "b"}}
+    assert result.map == {"ta": "a", "tb": "b"}
+    assert result.prefix_map["t"] == ["a", "b"]
+    assert result.m17n_mim == input_method.render_m17n(map_=result.map)
+    assert result.coverage == coverage.report(covered={"a", "b"})
+
+
+def test_build_parsed_group() -> None:
+    group = data.Group(
+        name="X",
+        prefix="x",
+        maps=dict(main={}),
+        expressions=dict(main=["map", "main"]),
+    )
+
+    result = unimnim.build({"x": group}, m17n_name="custom")
+
+    assert result.groups == {"x": group}
+    assert result.map == {}
+    assert "(input-method t custom)" in result.m17n_mim
+
+
+def test_build_errors() -> None:
+    with pytest.raises(ExceptionGroup) as exc_info:
+        unimnim.build({"ok": _TEST_GROUP, "bad": "[", "worse": "x = 1"})
+
+    assert len(exc_info.value.exceptions) == 2
+    assert sorted(
+        note
+        for exception in exc_info.value.exceptions
+        for note in exception.__notes__
+    ) == ["While parsing group 'bad'", "While parsing group 'worse'"]
+
+
+def test_build_context_reuses_groups() -> None:
+    context = unimnim.BuildContext()
+
+    first = unimnim.build({"test": _TEST_GROUP}, context=context)
+    unchanged = unimnim.build({"test": _TEST_GROUP}, context=context)
+    changed = unimnim.build(
+        {"test": _TEST_GROUP.replace('prefix = "t"', 'prefix = "u"')},
+        context=context,
+    )
+
+    assert unchanged.groups["test"] is first.groups["test"]
+    assert unchanged.group_maps["test"] is first.group_maps["test"]
+    assert changed.map == {"ua": "a", "ub": "b"}
+
+
+@pytest.mark.parametrize(
+    "group_id,source",
+    (
+        ("latin", "Latn"),
+        ("x/Latn", "Latn"),
+        ("Grek", "Latn"),
+    ),
+)
+def test_build_custom_group_uses_all_known_sequences(
+    group_id: str,
+    source: str,
+) -> None:
+    packaged = unimnim.packaged_sources()
+
+    custom = unimnim.build({group_id: packaged[source]})
+
+    assert custom.map == unimnim.build({source: packaged[source]}).map
+
+
+def test_build_packaged_sources_matches_main(tmp_path: pathlib.Path) -> None:
+    main.main(args=(f"--write-all={tmp_path}",))
+
+    result = unimnim.build(unimnim.packaged_sources())
+
+    assert json.loads((tmp_path / "map.json").read_text()) == result.map
+    assert (tmp_path / "unimnim.mim").read_text() == result.m17n_mim
+    assert (
+        json.loads((tmp_path / "coverage.json").read_text()) == result.coverage
+    )
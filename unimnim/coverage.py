@@ -8,31 +8,185 @@ probably not very good for statistics about how comprehensive the data is.
 """
 
 import collections
-from collections.abc import Mapping, Set
-from typing import Any
-
-import icu
+from collections.abc import Iterable, Iterator, Mapping, Sequence, Set
+import dataclasses
+import functools
+import itertools
+from typing import Any, Self
 
 from unimnim import input_method
 
 
+def _bitset(sequence_ids: Iterable[int], /) -> int:
+    """Returns an int with the bits for the given sequence IDs set."""
+    # Setting bits one at a time in a large int is quadratic, so this sets them
+    # in a bytearray instead.
+    sequence_ids = list(sequence_ids)
+    bits = bytearray(max(sequence_ids, default=0) // 8 + 1)
+    for sequence_id in sequence_ids:
+        bits[sequence_id >> 3] |= 1 << (sequence_id & 7)
+    return int.from_bytes(bits, "little")
+
+
+def _sequence_ids(bitset: int, /) -> Iterator[int]:
+    """Yields the sequence IDs in a bitset, in order."""
+    for byte_index, byte in enumerate(
+        bitset.to_bytes((bitset.bit_length() + 7) // 8, "little")
+    ):
+        if not byte:
+            continue
+        for bit in range(8):
+            if byte & (1 << bit):
+                yield byte_index * 8 + bit
+
+
+@functools.lru_cache(maxsize=input_method.KNOWN_SEQUENCES_CACHE_SIZE)
+def _sequences(scripts: frozenset[str] | None) -> Sequence[str]:
+    """Returns all known sequences, indexed by sequence ID."""
+    return tuple(input_method.known_sequences(scripts))
+
+
+@functools.lru_cache(maxsize=input_method.KNOWN_SEQUENCES_CACHE_SIZE)
+def _sequence_id_by_sequence(
+    scripts: frozenset[str] | None,
+) -> Mapping[str, int]:
+    return {
+        sequence: index for index, sequence in enumerate(_sequences(scripts))
+    }
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class _Key:
+    """Known sequences in one key of a section of the report.
+
+    Attributes:
+        bitset: Bitset of sequence IDs.
+        sequence_ids: The same sequence IDs, sorted by sequence.
+    """
+
+    bitset: int
+    sequence_ids: Sequence[int]
+
+    @classmethod
+    def build(
+        cls, sequence_ids: Sequence[int], /, *, sequences: Sequence[str]
+    ) -> Self:
+        return cls(
+            bitset=_bitset(sequence_ids),
+            sequence_ids=sorted(
+                sequence_ids, key=lambda sequence_id: sequences[sequence_id]
+            ),
+        )
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class _Sections:
+    """Known sequences in each key of each section of the report.
+
+    Attributes:
+        language: Map from language to sequences.
+        script_all: Map from script to sequences.
+        script_exemplar: Map from script to sequences that are from at least
+            one language.
+    """
+
+    language: Mapping[str, _Key]
+    script_all: Mapping[str, _Key]
+    script_exemplar: Mapping[str, _Key]
+
+
+@functools.lru_cache(maxsize=input_method.KNOWN_SEQUENCES_CACHE_SIZE)
+def _sections(scripts: frozenset[str] | None) -> _Sections:
+    import icu
+
+    sequence_ids_by_language = collections.defaultdict[str, list[int]](list)
+    all_sequence_ids_by_script = collections.defaultdict[str, list[int]](list)
+    exemplar_sequence_ids_by_script = collections.defaultdict[str, list[int]](
+        list
+    )
+    script_name_by_int = dict[int, str]()
+    for sequence_id, (sequence, languages) in enumerate(
+        input_method.known_sequences(scripts).items()
+    ):
+        for language in languages:
+            sequence_ids_by_language[language].append(sequence_id)
+        for script_int in icu.Script.getScriptExtensions(sequence[0]):
+            if (script := script_name_by_int.get(script_int)) is None:
+                script = icu.Char.getPropertyValueName(
+                    icu.UProperty.SCRIPT, script_int
+                )
+                script_name_by_int[script_int] = script
+            all_sequence_ids_by_script[script].append(sequence_id)
+            if languages:
+                exemplar_sequence_ids_by_script[script].append(sequence_id)
+    return _Sections(
+        language={
+            key: _Key.build(ids, sequences=_sequences(scripts))
+            for key, ids in sequence_ids_by_language.items()
+        },
+        script_all={
+            key: _Key.build(ids, sequences=_sequences(scripts))
+            for key, ids in all_sequence_ids_by_script.items()
+        },
+        script_exemplar={
+            key: _Key.build(ids, sequences=_sequences(scripts))
+            for key, ids in exemplar_sequence_ids_by_script.items()
+        },
+    )
+
+
+def _covered_bitset(
+    covered: Set[str], /, *, scripts: frozenset[str] | None
+) -> int:
+    sequence_id_by_sequence = _sequence_id_by_sequence(scripts)
+    return _bitset(
+        sequence_id_by_sequence[sequence]
+        for sequence in covered
+        if sequence in sequence_id_by_sequence
+    )
+
+
 def _report_section(
-    section: Mapping[str, Set[str]], *, covered: Set[str]
+    section: Mapping[str, _Key],
+    *,
+    sequences: Sequence[str],
+    covered: int,
+    include_missing: bool,
 ) -> Any:
+    covered_bytes = covered.to_bytes(len(sequences) // 8 + 1, "little")
     report = dict[str, Any]()
     for key, characters in section.items():
-        missing = characters - covered
+        total = len(characters.sequence_ids)
+        covered_count = (characters.bitset & covered).bit_count()
         report[key] = dict(
-            total=len(characters),
-            covered_count=len(characters & covered),
-            missing_count=len(missing),
-            missing=sorted(missing),
+            total=total,
+            covered_count=covered_count,
+            missing_count=total - covered_count,
         )
+        if include_missing:
+            report[key]["missing"] = [
+                sequences[sequence_id]
+                for sequence_id in characters.sequence_ids
+                if not covered_bytes[sequence_id >> 3]
+                & (1 << (sequence_id & 7))
+            ]
     return report
 
 
-def report(*, covered: Set[str]) -> Any:
-    """Returns a coverage report as a JSON-encodable object."""
+def report(
+    *,
+    covered: Set[str],
+    include_missing: bool = True,
+    known_sequence_scripts: frozenset[str] | None = None,
+) -> Any:
+    """Returns a coverage report as a JSON-encodable object.
+
+    Args:
+        covered: Results that are covered.
+        include_missing: Whether to list the missing sequences, in addition to
+            counting them.
+        known_sequence_scripts: Argument to input_method.known_sequences().
+    """
     # TODO: dseomn - Combine this data with keyboard layout info in a useful
     # way. The fact that "0" isn't covered by mnemonics using an en_US keyboard
     # isn't particularly interesting, because that keyboard has a 0 key. On the
@@ -45,26 +199,101 @@ def report(*, covered: Set[str]) -> Any:
     # https://github.com/Vyshantha/multiscripteditor/tree/main/editorClient/src/assets/keyboard-layouts
     # might work.
 
-    characters_by_language = collections.defaultdict(set)
-    for character, languages in input_method.known_sequences().items():
-        for language in languages:
-            characters_by_language[language].add(character)
-
-    all_characters_by_script = collections.defaultdict(set)
-    exemplar_characters_by_script = collections.defaultdict(set)
-    for character, languages in input_method.known_sequences().items():
-        for script_int in icu.Script.getScriptExtensions(character[0]):
-            script = icu.Char.getPropertyValueName(
-                icu.UProperty.SCRIPT, script_int
-            )
-            all_characters_by_script[script].add(character)
-            if languages:
-                exemplar_characters_by_script[script].add(character)
-
+    sequences = _sequences(known_sequence_scripts)
+    sections = _sections(known_sequence_scripts)
+    covered_bitset = _covered_bitset(covered, scripts=known_sequence_scripts)
     return {
-        "language": _report_section(characters_by_language, covered=covered),
-        "scriptAll": _report_section(all_characters_by_script, covered=covered),
+        "language": _report_section(
+            sections.language,
+            sequences=sequences,
+            covered=covered_bitset,
+            include_missing=include_missing,
+        ),
+        "scriptAll": _report_section(
+            sections.script_all,
+            sequences=sequences,
+            covered=covered_bitset,
+            include_missing=include_missing,
+        ),
         "scriptExemplar": _report_section(
-            exemplar_characters_by_script, covered=covered
+            sections.script_exemplar,
+            sequences=sequences,
+            covered=covered_bitset,
+            include_missing=include_missing,
+        ),
+    }
+
+
+def _covered_counts(section: Mapping[str, _Key], *, covered: int) -> Any:
+    counts = dict[str, int]()
+    for key, characters in section.items():
+        if covered_count := (characters.bitset & covered).bit_count():
+            counts[key] = covered_count
+    return counts
+
+
+def report_by_group(
+    *,
+    group_maps: Mapping[str, Mapping[str, str]],
+    known_sequence_scripts: frozenset[str] | None = None,
+) -> Any:
+    """Returns a per-group coverage report as a JSON-encodable object.
+
+    Args:
+        group_maps: Map from group ID to its map from mnemonic to result, from
+            input_method.generate_group_maps.
+        known_sequence_scripts: Argument to input_method.known_sequences().
+    """
+    sections = _sections(known_sequence_scripts)
+    covered_by_group = {
+        group_id: _covered_bitset(
+            frozenset(group_map.values()), scripts=known_sequence_scripts
+        )
+        for group_id, group_map in group_maps.items()
+    }
+    covered_by_any = 0
+    covered_by_multiple = 0
+    for covered in covered_by_group.values():
+        covered_by_multiple |= covered_by_any & covered
+        covered_by_any |= covered
+    # Comparing every pair of groups' bitsets would be quadratic in the number
+    # of groups, so this finds the groups of each overlapping sequence, then
+    # counts pairs from those.
+    group_ids_by_sequence_id = collections.defaultdict[int, list[str]](list)
+    for group_id, covered in covered_by_group.items():
+        for sequence_id in _sequence_ids(covered & covered_by_multiple):
+            group_ids_by_sequence_id[sequence_id].append(group_id)
+    sequences = _sequences(known_sequence_scripts)
+    overlap_characters = {
+        sequences[sequence_id]: group_ids
+        for sequence_id, group_ids in group_ids_by_sequence_id.items()
+    }
+    pair_counts = collections.Counter[tuple[str, str]]()
+    for group_ids in group_ids_by_sequence_id.values():
+        pair_counts.update(itertools.combinations(group_ids, 2))
+    group_index = {group_id: index for index, group_id in enumerate(group_maps)}
+    overlap_pairs = [
+        dict(groups=list(pair), count=count)
+        for pair, count in sorted(
+            pair_counts.items(),
+            key=lambda item: (group_index[item[0][0]], group_index[item[0][1]]),
+        )
+    ]
+    return {
+        "group": {
+            group_id: dict(
+                covered_count=covered.bit_count(),
+                language=_covered_counts(sections.language, covered=covered),
+                scriptAll=_covered_counts(sections.script_all, covered=covered),
+                scriptExemplar=_covered_counts(
+                    sections.script_exemplar, covered=covered
+                ),
+            )
+            for group_id, covered in covered_by_group.items()
+        },
+        "overlap": dict(
+            count=covered_by_multiple.bit_count(),
+            pairs=overlap_pairs,
+            characters=dict(sorted(overlap_characters.items())),
         ),
     }
@@ -22,3 +22,61 @@ def test_report() -> None:
     script_exemplar = report["scriptExemplar"]
     assert script_exemplar["Latn"]["total"] > 26 * 2
     assert script_exemplar["Latn"]["covered_count"] == 1
+
+
+def test_report_without_missing() -> None:
+    report = coverage.report(covered={"a", "not a known sequence"})
+
+    report_without_missing = coverage.report(
+        covered={"a", "not a known sequence"}, include_missing=False
+    )
+
+    for section_name, section in report.items():
+        for key, counts in section.items():
+            assert report_without_missing[section_name][key] == {
+                name: count
+                for name, count in counts.items()
+                if name != "missing"
+            }
+
+
+def test_report_by_group() -> None:
+    report = coverage.report_by_group(
+        group_maps={
+            "latin": {"a": "a", "b": "b", "x": "not a known sequence"},
+            "greek": {"a": "\N{GREEK SMALL LETTER ALPHA}"},
+            "other": {"a": "a"},
+        }
+    )
+
+    assert report["group"]["latin"]["covered_count"] == 2
+    assert report["group"]["latin"]["scriptAll"]["Latn"] == 2
+    assert "Grek" not in report["group"]["latin"]["scriptAll"]
+    assert report["group"]["latin"]["language"]["en"] == 2
+    assert report["group"]["greek"]["scriptExemplar"] == {"Grek": 1}
+    assert report["group"]["other"]["covered_count"] == 1
+    assert report["overlap"] == {
+        "count": 1,
+        "pairs": [{"groups": ["latin", "other"], "count": 1}],
+        "characters": {"a": ["latin", "other"]},
+    }
+
+
+def test_report_by_group_overlap_pairs() -> None:
+    report = coverage.report_by_group(
+        group_maps={
+            "c": {"a": "a", "b": "b"},
+            "b": {"a": "a"},
+            "a": {"a": "a", "b": "b"},
+        }
+    )
+
+    assert report["overlap"] == {
+        "count": 2,
+        "pairs": [
+            {"groups": ["c", "b"], "count": 1},
+            {"groups": ["c", "a"], "count": 2},
+            {"groups": ["b", "a"], "count": 1},
+        ],
+        "characters": {"a": ["c", "b", "a"], "b": ["c", "a"]},
+    }
@@ -3,6 +3,7 @@
 # SPDX-License-Identifier: Apache-2.0
 
 from collections.abc import Mapping
+import os
 import pathlib
 import re
 from typing import Any
@@ -227,12 +228,52 @@ def test_group_parse_error(raw: Any, error_regex: str) -> None:
                 expressions=dict(main=["union"]),
             ),
         ),
+        (
+            "common/control",
+            dict(
+                prefix="Z",
+                maps=dict(
+                    main={
+                        "0": "U+0000 (NUL)",
+                        "NUL": "U+0000 (NULL)",
+                        "CRLF": "U+000D (CR), U+000A (LF)",
+                    },
+                ),
+                expressions=dict(main=["map", "main"]),
+            ),
+            dict(
+                name="common/control",
+                prefix="Z",
+                maps=dict(main={"0": "\0", "NUL": "\0", "CRLF": "\r\n"}),
+                expressions=dict(main=["map", "main"]),
+                aliases={"\0": ("NUL", "NULL"), "\n": ("LF",), "\r": ("CR",)},
+            ),
+        ),
     ),
 )
 def test_group_parse(group_id: str, raw: Any, expected: Any) -> None:
     assert data.Group.parse(raw, group_id=group_id) == data.Group(**expected)
 
 
+def test_aliases() -> None:
+    groups = (
+        data.Group(
+            name="",
+            prefix="",
+            expressions={},
+            aliases={"\0": ("NULL",)},
+        ),
+        data.Group(
+            name="",
+            prefix="",
+            expressions={},
+            aliases={"\0": ("NUL",), "\n": ("LF",)},
+        ),
+    )
+
+    assert data.aliases(groups) == {"\0": {"NUL", "NULL"}, "\n": {"LF"}}
+
+
 def test_load(tmp_path: pathlib.Path) -> None:
     (tmp_path / "subdir").mkdir()
     (tmp_path / "subdir" / "latin.toml").write_text("""
@@ -270,3 +311,157 @@ def test_load(tmp_path: pathlib.Path) -> None:
             group_id="greek",
         ),
     }
+
+
+_MINIMAL_GROUP = """
+    prefix = "x"
+    maps.main = {}
+    expressions.main = ["map", "main"]
+"""
+
+
+def test_load_sorted(tmp_path: pathlib.Path) -> None:
+    for group_id in ("b", "c", "a"):
+        (tmp_path / f"{group_id}.toml").write_text(_MINIMAL_GROUP)
+
+    actual = data.load(tmp_path)
+
+    assert tuple(actual) == ("a", "b", "c")
+
+
+def test_load_errors(tmp_path: pathlib.Path) -> None:
+    (tmp_path / "ok.toml").write_text(_MINIMAL_GROUP)
+    (tmp_path / "bad_syntax.toml").write_text("[")
+    (tmp_path / "bad_group.toml").write_text("not_a_field = 1")
+
+    with pytest.raises(ExceptionGroup) as exc_info:
+        data.load(tmp_path)
+
+    assert len(exc_info.value.exceptions) == 2
+    notes = sorted(
+        note
+        for exception in exc_info.value.exceptions
+        for note in exception.__notes__
+    )
+    assert notes == [
+        f"While loading {tmp_path / 'bad_group.toml'}",
+        f"While loading {tmp_path / 'bad_syntax.toml'}",
+    ]
+
+
+def test_load_parallel(
+    tmp_path: pathlib.Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    (tmp_path / "latin.toml").write_text("""
+        prefix = "l"
+        [maps.main]
+        "a" = "U+0061 LATIN SMALL LETTER A"
+        [expressions]
+        main = ["map", "main"]
+    """)
+    monkeypatch.setattr(data, "_PARALLEL_LOAD_MIN_FILES", 0)
+    monkeypatch.setattr(os, "sched_getaffinity", lambda pid: {0, 1})
+
+    assert tuple(data.load(tmp_path)) == ("latin",)
+
+    (tmp_path / "bad.toml").write_text("[")
+    with pytest.raises(ExceptionGroup) as exc_info:
+        data.load(tmp_path)
+
+    assert len(exc_info.value.exceptions) == 1
+
+
+def test_parse_cache_info() -> None:
+    data.parse_explicit_string("U+0061 LATIN SMALL LETTER A, U+0062")
+    before = data.parse_cache_info()
+    data.parse_explicit_string("U+0061 LATIN SMALL LETTER A, U+0062")
+    data.parse_explicit_string("U+0062, U+0061 LATIN SMALL LETTER A")
+    after = data.parse_cache_info()
+
+    assert after["explicit_string"]["hits"] == (
+        before["explicit_string"]["hits"] + 1
+    )
+    assert after["code_point"]["hits"] == before["code_point"]["hits"] + 2
+    assert 0 < after["code_point"]["hit_rate"] <= 1
+
+
+def _fail_parse(*args: Any, **kwargs: Any) -> data.Group:
+    raise AssertionError("Group.parse should not be called.")
+
+
+def test_load_cache(
+    tmp_path: pathlib.Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    (tmp_path / "data").mkdir()
+    (tmp_path / "data" / "latin.toml").write_text(_MINIMAL_GROUP)
+    expected = data.load(tmp_path / "data", cache_dir=tmp_path / "cache")
+    monkeypatch.setattr(data.Group, "parse", _fail_parse)
+
+    actual = data.load(tmp_path / "data", cache_dir=tmp_path / "cache")
+
+    assert actual == expected
+
+
+@pytest.mark.parametrize(
+    "change",
+    (
+        "contents",
+        "revalidate",
+        "invalid_cache",
+    ),
+)
+def test_load_cache_miss(
+    change: str,
+    tmp_path: pathlib.Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    (tmp_path / "data").mkdir()
+    (tmp_path / "data" / "latin.toml").write_text(_MINIMAL_GROUP)
+    data.load(tmp_path / "data", cache_dir=tmp_path / "cache")
+    parse = data.Group.parse
+    parsed_group_ids = []
+
+    def _parse(raw: Any, *, group_id: str) -> data.Group:
+        parsed_group_ids.append(group_id)
+        return parse(raw, group_id=group_id)
+
+    monkeypatch.setattr(data.Group, "parse", _parse)
+    revalidate = False
+    match change:
+        case "contents":
+            (tmp_path / "data" / "latin.toml").write_text(
+                _MINIMAL_GROUP.replace('"x"', '"y"')
+            )
+        case "revalidate":
+            revalidate = True
+        case "invalid_cache":
+            for cache_file in (tmp_path / "cache").iterdir():
+                cache_file.write_bytes(b"not a pickle")
+
+    actual = data.load(
+        tmp_path / "data",
+        cache_dir=tmp_path / "cache",
+        revalidate=revalidate,
+    )
+
+    assert parsed_group_ids == ["latin"]
+    assert actual["latin"].prefix == ("y" if change == "contents" else "x")
+
+
+def test_load_group_ids(tmp_path: pathlib.Path) -> None:
+    for group_id in ("a", "b", "c"):
+        (tmp_path / f"{group_id}.toml").write_text(_MINIMAL_GROUP)
+    (tmp_path / "d.toml").write_text("[")
+
+    actual = data.load(tmp_path, group_ids=("c", "a"))
+
+    assert tuple(actual) == ("a", "c")
+
+
+def test_load_group_ids_unknown(tmp_path: pathlib.Path) -> None:
+    (tmp_path / "a.toml").write_text(_MINIMAL_GROUP)
+
+    with pytest.raises(ValueError, match=r"do not exist: \['b'\]"):
+        data.load(tmp_path, group_ids=("a", "b"))
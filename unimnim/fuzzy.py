@@ -0,0 +1,80 @@
+# SPDX-FileCopyrightText: 2025 David Mandelberg <david@mandelberg.org>
+#
+# SPDX-License-Identifier: Apache-2.0
+"""Fuzzy search for mistyped mnemonics."""
+
+from collections.abc import Sequence
+import dataclasses
+
+from unimnim import runtime
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class Match:
+    """Mnemonic that's close to a query.
+
+    Attributes:
+        mnemonic: Mnemonic.
+        result: Result of the mnemonic.
+        distance: Levenshtein distance from the query to the mnemonic.
+    """
+
+    mnemonic: str
+    result: str
+    distance: int
+
+
+def search(
+    trie: runtime.Trie,
+    query: str,
+    *,
+    max_distance: int = 1,
+    limit: int | None = None,
+) -> Sequence[Match]:
+    """Returns mnemonics within max_distance edits of query.
+
+    This walks the trie while running a Levenshtein automaton for query, so
+    each node shares the work done for its prefix, and subtrees that can't be
+    within max_distance of query are skipped entirely.
+
+    Args:
+        trie: Mnemonics to search.
+        query: Possibly mistyped mnemonic.
+        max_distance: Maximum number of insertions, deletions, and
+            substitutions.
+        limit: Maximum number of matches to return, or None for all of them.
+
+    Returns:
+        Matches, sorted by distance and then mnemonic.
+    """
+    matches = list[Match]()
+    # Each state of the automaton is the last row of the Wagner-Fischer matrix
+    # for the node's prefix, i.e., row[i] is the distance from query[:i] to the
+    # prefix.
+    stack = [(runtime.ROOT, tuple(range(len(query) + 1)))]
+    while stack:
+        node, row = stack.pop()
+        if row[-1] <= max_distance and (
+            (result := trie.result(node)) is not None
+        ):
+            matches.append(
+                Match(
+                    mnemonic=trie.prefix(node),
+                    result=result,
+                    distance=row[-1],
+                )
+            )
+        for key, child in trie.children(node).items():
+            child_row = [row[0] + 1]
+            for i, query_key in enumerate(query):
+                child_row.append(
+                    min(
+                        child_row[i] + 1,
+                        row[i + 1] + 1,
+                        row[i] + (query_key != key),
+                    )
+                )
+            if min(child_row) <= max_distance:
+                stack.append((child, tuple(child_row)))
+    matches.sort(key=lambda match: (match.distance, match.mnemonic))
+    return matches[:limit]
@@ -0,0 +1,122 @@
+# SPDX-FileCopyrightText: 2025 David Mandelberg <david@mandelberg.org>
+#
+# SPDX-License-Identifier: Apache-2.0
+
+from collections.abc import Mapping, Sequence
+import itertools
+import random
+
+import pytest
+
+from unimnim import fuzzy
+from unimnim import runtime
+
+
+def _levenshtein(a: str, b: str) -> int:
+    row = list(range(len(b) + 1))
+    for i, a_key in enumerate(a, start=1):
+        previous_row, row = row, [i]
+        for j, b_key in enumerate(b, start=1):
+            row.append(
+                min(
+                    row[j - 1] + 1,
+                    previous_row[j] + 1,
+                    previous_row[j - 1] + (a_key != b_key),
+                )
+            )
+    return row[-1]
+
+
+@pytest.mark.parametrize(
+    "map_,query,max_distance,limit,expected",
+    (
+        ({}, "a", 1, None, ()),
+        (
+            {"a": "1"},
+            "a",
+            0,
+            None,
+            (fuzzy.Match(mnemonic="a", result="1", distance=0),),
+        ),
+        ({"ab": "1"}, "a", 0, None, ()),
+        (
+            {"ab": "1", "ac": "2", "b": "3", "abcd": "4"},
+            "ab",
+            1,
+            None,
+            (
+                fuzzy.Match(mnemonic="ab", result="1", distance=0),
+                fuzzy.Match(mnemonic="ac", result="2", distance=1),
+                fuzzy.Match(mnemonic="b", result="3", distance=1),
+            ),
+        ),
+        (
+            {"ab": "1", "ac": "2", "b": "3"},
+            "ab",
+            1,
+            2,
+            (
+                fuzzy.Match(mnemonic="ab", result="1", distance=0),
+                fuzzy.Match(mnemonic="ac", result="2", distance=1),
+            ),
+        ),
+        (
+            {"La'": "\N{LATIN SMALL LETTER A WITH ACUTE}"},
+            "L'a",
+            2,
+            None,
+            (
+                fuzzy.Match(
+                    mnemonic="La'",
+                    result="\N{LATIN SMALL LETTER A WITH ACUTE}",
+                    distance=2,
+                ),
+            ),
+        ),
+        ({"": "1"}, "ab", 1, None, ()),
+        (
+            {"": "1"},
+            "a",
+            1,
+            None,
+            (fuzzy.Match(mnemonic="", result="1", distance=1),),
+        ),
+    ),
+)
+def test_search(
+    map_: Mapping[str, str],
+    query: str,
+    max_distance: int,
+    limit: int | None,
+    expected: Sequence[fuzzy.Match],
+) -> None:
+    trie = runtime.Trie.build(map_)
+
+    assert (
+        tuple(fuzzy.search(trie, query, max_distance=max_distance, limit=limit))
+        == expected
+    )
+
+
+def test_search_matches_brute_force() -> None:
+    rng = random.Random(0)
+    mnemonics = {
+        "".join(key)
+        for length in range(1, 4)
+        for key in itertools.product("ab'", repeat=length)
+    }
+    map_ = {mnemonic: mnemonic.upper() for mnemonic in mnemonics}
+    trie = runtime.Trie.build(map_)
+
+    for query in rng.sample(sorted(mnemonics), 10) + ["", "aaaaa", "c"]:
+        for max_distance in range(3):
+            assert {
+                (match.mnemonic, match.distance)
+                for match in fuzzy.search(
+                    trie, query, max_distance=max_distance
+                )
+            } == {
+                (mnemonic, _levenshtein(query, mnemonic))
+                for mnemonic in mnemonics
+                if _levenshtein(query, mnemonic) <= max_distance
+            }
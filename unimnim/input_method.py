@@ -3,24 +3,33 @@
 # SPDX-License-Identifier: Apache-2.0
 """Generates the input method from data."""
 
+import bisect
 import collections
 from collections.abc import Collection, Iterable, Mapping, Sequence, Set
 import dataclasses
 import functools
+from importlib import resources
 import itertools
+import os
 import pprint
 import sys
-from typing import Any
+import typing
+from typing import Any, Self
 import unicodedata
 
-import icu
-import jinja2
-
 from unimnim import data
+from unimnim import profiling
 
 _TEXT_VARIATION_SELECTOR = "\N{VARIATION SELECTOR-15}"
 _EMOJI_VARIATION_SELECTOR = "\N{VARIATION SELECTOR-16}"
 
+KNOWN_SEQUENCES_CACHE_SIZE = 4
+"""Number of sets of scripts to cache known sequences and indexes of them for.
+
+Each set of scripts can take tens of MB, so this keeps a long-running process
+that builds many different subsets from growing without bound.
+"""
+
 
 def _extended_grapheme_clusters(s: str, /) -> Iterable[str]:
     if len(s) == 1:
@@ -28,6 +37,8 @@ def _extended_grapheme_clusters(s: str, /) -> Iterable[str]:
         # it.
         yield s
         return
+    import icu
+
     it = icu.BreakIterator.createCharacterInstance(icu.Locale.getRoot())
     icu_string = icu.UnicodeString(s)
     it.setText(icu_string)
@@ -35,12 +46,76 @@ def _extended_grapheme_clusters(s: str, /) -> Iterable[str]:
         yield str(icu_string[start:end])
 
 
-@functools.cache
-def known_sequences() -> Mapping[str, Sequence[str]]:
+def known_sequence_scripts(group_ids: Iterable[str]) -> frozenset[str] | None:
+    """Returns scripts to pass to known_sequences() for some groups.
+
+    Args:
+        group_ids: Groups that the known sequences are for.
+
+    Returns:
+        The group IDs if they're all script codes, e.g., "Latn", or None if
+        any of them aren't, e.g., "common/math".
+    """
+    import icu
+
+    scripts = frozenset(group_ids)
+    for script in scripts:
+        script_int = icu.Char.getPropertyValueEnum(icu.UProperty.SCRIPT, script)
+        # ICU matches names loosely, e.g., "latin" is Latn, but only the exact
+        # codes are the IDs of script groups.
+        # TODO: https://gitlab.pyicu.org/main/pyicu/-/issues/177 - Use
+        # icu.UProperty.INVALID_CODE instead of -1.
+        if (
+            script_int == -1
+            or icu.Char.getPropertyValueName(
+                icu.UProperty.SCRIPT,
+                script_int,
+                icu.UPropertyNameChoice.SHORT_PROPERTY_NAME,
+            )
+            != script
+        ):
+            return None
+    return scripts
+
+
+# Scripts that are combinations of other scripts. No code points have these as
+# their script, so they're replaced with their parts when comparing with the
+# scripts of code points.
+_SCRIPT_PARTS = {
+    "Hanb": frozenset({"Hani", "Bopo"}),
+    "Hrkt": frozenset({"Hira", "Kana"}),
+    "Jpan": frozenset({"Hani", "Hira", "Kana"}),
+    "Kore": frozenset({"Hang", "Hani"}),
+}
+
+
+def _uses_scripts(exemplars: Iterable[str], scripts: Set[str]) -> bool:
+    """Returns whether any code point in exemplars has one of the scripts."""
+    import icu
+
+    return any(
+        icu.Script.getScript(code_point).getShortName() in scripts
+        for sequence in exemplars
+        for code_point in sequence
+    )
+
+
+@functools.lru_cache(maxsize=KNOWN_SEQUENCES_CACHE_SIZE)
+def known_sequences(
+    scripts: frozenset[str] | None = None,
+) -> Mapping[str, Sequence[str]]:
     """Returns a map from known sequences to languages they're from.
 
     The languages can be empty for known sequences with unknown language.
+
+    Args:
+        scripts: If not None, only languages with standard exemplar
+            characters in scripts are used, and emoji are skipped. Groups for
+            those scripts get the same results either way, see
+            known_sequence_scripts().
     """
+    import icu
+
     # TODO: dseomn - Add sequences from
     # https://www.unicode.org/Public/UNIDATA/NamedSequences.txt and
     # https://www.unicode.org/Public/UNIDATA/NamedSequencesProv.txt
@@ -65,9 +140,26 @@ def known_sequences() -> Mapping[str, Sequence[str]]:
         ):
             _add(code_point)
 
+    code_point_scripts = (
+        None
+        if scripts is None
+        else frozenset(
+            itertools.chain.from_iterable(
+                _SCRIPT_PARTS.get(script, (script,)) for script in scripts
+            )
+        )
+    )
     for language in icu.Locale.getISOLanguages():
         locale = icu.Locale(language)
         locale_data = icu.LocaleData(language)
+        if code_point_scripts is not None and not _uses_scripts(
+            locale_data.getExemplarSet(
+                icu.USET_ADD_CASE_MAPPINGS,
+                icu.ULocaleDataExemplarSetType.ES_STANDARD,
+            ),
+            code_point_scripts,
+        ):
+            continue
         for exemplar_type in (
             icu.ULocaleDataExemplarSetType.ES_STANDARD,
             icu.ULocaleDataExemplarSetType.ES_AUXILIARY,
@@ -84,7 +176,11 @@ def known_sequences() -> Mapping[str, Sequence[str]]:
             for digit in numbering_system.getDescription():
                 _add(digit, language=language)
 
-    for uproperty in (icu.UProperty.EMOJI, icu.UProperty.RGI_EMOJI):
+    for uproperty in (
+        ()
+        if scripts is not None
+        else (icu.UProperty.EMOJI, icu.UProperty.RGI_EMOJI)
+    ):
         for emoji in icu.Char.getBinaryPropertySet(uproperty):
             _add(emoji, language="emoji")
             if len(emoji) == 2 and emoji[1] == _EMOJI_VARIATION_SELECTOR:
@@ -100,18 +196,52 @@ def known_sequences() -> Mapping[str, Sequence[str]]:
     }
 
 
-@functools.cache
-def _known_sequences_and_prefixes() -> Set[str]:
+@functools.lru_cache(maxsize=KNOWN_SEQUENCES_CACHE_SIZE)
+def _known_sequences_and_prefixes(
+    scripts: frozenset[str] | None = None,
+) -> Set[str]:
     """Returns known sequences and prefixes of it."""
     result = set()
-    for sequence in known_sequences():
+    for sequence in known_sequences(scripts):
         for prefix_len in range(1, len(sequence) + 1):
             result.add(sequence[:prefix_len])
     return result
 
 
+@functools.lru_cache(maxsize=KNOWN_SEQUENCES_CACHE_SIZE)
+def _known_sequences_and_prefixes_nfd(
+    scripts: frozenset[str] | None = None,
+) -> Sequence[str]:
+    """Returns the NFDs of the NFC known sequences and prefixes, sorted.
+
+    Only NFC strings are included because those are the only ones that
+    combining can produce, and NFD is used so that all continuations of a base
+    result are adjacent.
+    """
+    return sorted(
+        unicodedata.normalize("NFD", sequence)
+        for sequence in _known_sequences_and_prefixes(scripts)
+        if unicodedata.is_normalized("NFC", sequence)
+    )
+
+
+def precompute_known_sequences(scripts: frozenset[str] | None = None) -> None:
+    """Computes and caches known sequences and the indexes derived from them.
+
+    This doesn't depend on any data, so it can run in the background while
+    data is loading. It must finish before generating maps, otherwise they
+    compute the same things again.
+
+    Args:
+        scripts: See known_sequences().
+    """
+    _known_sequences_and_prefixes_nfd(scripts)
+
+
 def _lookup_correct_name(name: str) -> str:
     """Like unicodedata.lookup, but excludes incorrect names."""
+    import icu
+
     result = unicodedata.lookup(name)
     name_corrected = icu.Char.charName(
         result, icu.UCharNameChoice.CHAR_NAME_ALIAS
@@ -169,8 +299,94 @@ class _Map:
             self.add(mnemonic, result, is_known=mnemonic in other.known)
 
 
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class _AppendIndex:
+    """Append map, indexed for finding entries that can follow a base result.
+
+    Attributes:
+        items: Entries of the append map, in order.
+        by_nfd: Map from the NFD of each combining result to the indexes of
+            the items with that result.
+        non_starters: Index and canonical combining class of each item whose
+            NFD starts with a non-starter. Those can be reordered with marks
+            at the end of the base result.
+    """
+
+    items: Sequence[tuple[str, str]]
+    by_nfd: Mapping[str, Sequence[int]]
+    non_starters: Sequence[tuple[int, int]]
+
+    @classmethod
+    def build(cls, append_map: "_Map", /) -> Self:
+        """Returns the index for an append map."""
+        items = tuple(append_map.all_.items())
+        by_nfd = collections.defaultdict[str, list[int]](list)
+        non_starters = list[tuple[int, int]]()
+        for item_index, (_, combining_result) in enumerate(items):
+            combining_result_nfd = unicodedata.normalize(
+                "NFD", combining_result
+            )
+            by_nfd[combining_result_nfd].append(item_index)
+            if combining_result_nfd and (
+                combining_class := unicodedata.combining(
+                    combining_result_nfd[0]
+                )
+            ):
+                non_starters.append((item_index, combining_class))
+        return cls(items=items, by_nfd=by_nfd, non_starters=non_starters)
+
+    def candidates(
+        self,
+        base_result_nfd: str,
+        *,
+        known_and_prefixes_nfd: Sequence[str],
+    ) -> Sequence[int]:
+        """Returns indexes of items that might combine with a base result.
+
+        Args:
+            base_result_nfd: NFD of the base result.
+            known_and_prefixes_nfd: See _known_sequences_and_prefixes_nfd().
+
+        Returns:
+            Indexes of items, in order, that include every item whose
+            combination with the base result is a known sequence or prefix.
+        """
+        # If the base ends with marks, a combining result that starts with a
+        # mark of a lower class is reordered into the base's marks, so its
+        # combination doesn't start with base_result_nfd.
+        last_combining_class = (
+            unicodedata.combining(base_result_nfd[-1]) if base_result_nfd else 0
+        )
+        candidates = {
+            item_index
+            for item_index, combining_class in self.non_starters
+            if combining_class < last_combining_class
+        }
+        # Otherwise, the NFD of the combination is base_result_nfd followed by
+        # the NFD of the combining result, so only continuations of the base
+        # in the known sequences and prefixes can match. Scanning those is only
+        # worth it when there are fewer of them than items.
+        continuation_index = bisect.bisect_left(
+            known_and_prefixes_nfd, base_result_nfd
+        )
+        continuations_end = continuation_index + len(self.items)
+        while continuation_index < len(known_and_prefixes_nfd) and (
+            continuation := known_and_prefixes_nfd[continuation_index]
+        ).startswith(base_result_nfd):
+            if continuation_index == continuations_end:
+                return range(len(self.items))
+            candidates.update(
+                self.by_nfd.get(continuation[len(base_result_nfd) :], ())
+            )
+            continuation_index += 1
+        return sorted(candidates)
+
+
 def _names_maps_to_map(
-    name_maps: Iterable[Mapping[str, str]], *, group_id: str
+    name_maps: Iterable[Mapping[str, str]],
+    *,
+    group_id: str,
+    counters: collections.Counter[str] | None = None,
 ) -> _Map:
     """Returns a map from the cartesian product of name maps."""
     map_ = _Map(group_id=group_id)
@@ -182,10 +398,15 @@ def _names_maps_to_map(
         for mnemonic_part, name_part in items:
             mnemonic_parts.append(mnemonic_part)
             name_parts.append(name_part)
+        if counters is not None:
+            counters["candidates"] += 1
+            counters["name_lookups"] += 1
         try:
             result_raw = _lookup_correct_name("".join(name_parts))
         except KeyError:
             continue
+        if counters is not None:
+            counters["name_lookup_hits"] += 1
         map_.add("".join(mnemonic_parts), result_raw)
     return map_
 
@@ -196,8 +417,16 @@ def _apply_combining(
     exclude_base: bool,
     append_maps: Collection[_Map],
     name_regex_replace_maps: Collection[data.NameRegexReplaceMap],
+    known_sequence_scripts: frozenset[str] | None = None,
+    counters: collections.Counter[str] | None = None,
 ) -> _Map:
     """Applies combining."""
+    known = known_sequences(known_sequence_scripts)
+    known_and_prefixes = _known_sequences_and_prefixes(known_sequence_scripts)
+    known_and_prefixes_nfd = _known_sequences_and_prefixes_nfd(
+        known_sequence_scripts
+    )
+    append_indexes = tuple(map(_AppendIndex.build, append_maps))
     combined_map = _Map(group_id=base.group_id)
     combining_to_check = collections.deque[tuple[str, str]](base.all_.items())
     added_to_queue = set(base.all_)
@@ -210,33 +439,54 @@ def _apply_combining(
             combining_to_check.append((mnemonic, result))
             added_to_queue.add(mnemonic)
 
+    # Many mnemonics have the same result, e.g., synonyms and different orders
+    # of the same marks, and what can be appended to a mnemonic only depends
+    # on its result. So this maps each result to its expansions: the suffix
+    # to append to a mnemonic, the combined result, and whether that's known.
+    expansions_by_result = dict[str, Sequence[tuple[str, str, bool]]]()
+
     def _combine_append(
-        append_map: _Map,
+        append_index: _AppendIndex,
+        expansions: list[tuple[str, str, bool]],
         *,
-        base_mnemonic: str,
         base_result: str,
+        base_result_nfd: str,
     ) -> None:
-        for combining_mnemonic, combining_result in append_map.all_.items():
+        candidates = append_index.candidates(
+            base_result_nfd,
+            known_and_prefixes_nfd=known_and_prefixes_nfd,
+        )
+        if counters is not None:
+            counters["append_attempts"] += len(candidates)
+        for item_index in candidates:
+            combining_mnemonic, combining_result = append_index.items[
+                item_index
+            ]
             combined_result = unicodedata.normalize(
                 "NFC", base_result + combining_result
             )
-            if combined_result not in _known_sequences_and_prefixes():
+            if combined_result not in known_and_prefixes:
+                if counters is not None:
+                    counters["prefix_rejections"] += 1
                 continue
-            combined_mnemonic = base_mnemonic + combining_mnemonic
-            _add(
-                combined_mnemonic,
-                combined_result,
-                is_known=combined_result in known_sequences(),
+            expansions.append(
+                (
+                    combining_mnemonic,
+                    combined_result,
+                    combined_result in known,
+                )
             )
 
     def _combine_name_regex_replace(
         name_regex_replace_map: data.NameRegexReplaceMap,
+        expansions: list[tuple[str, str, bool]],
         *,
-        base_mnemonic: str,
         base_result: str,
     ) -> None:
         if len(base_result) != 1:
             return
+        import icu
+
         # TODO: dseomn - Check the control names from NameAliases.txt, so that
         # name_regex_replace can be used for
         # https://en.wikipedia.org/wiki/Control_Pictures
@@ -247,37 +497,84 @@ def _apply_combining(
             return
         for combining_mnemonic, rules in name_regex_replace_map.items():
             for combining_pattern, combining_replacement in rules:
+                if counters is not None:
+                    counters["name_regex_attempts"] += 1
                 match = combining_pattern.fullmatch(base_result_name)
                 if match is None:
                     continue
                 combined_name = match.expand(combining_replacement)
+                if counters is not None:
+                    counters["name_lookups"] += 1
                 try:
                     combined_raw = _lookup_correct_name(combined_name)
                 except KeyError:
                     continue
-                combined_mnemonic = base_mnemonic + combining_mnemonic
-                _add(combined_mnemonic, combined_raw)
+                if counters is not None:
+                    counters["name_lookup_hits"] += 1
+                expansions.append((combining_mnemonic, combined_raw, True))
 
     while combining_to_check:
         mnemonic, result = combining_to_check.popleft()
-        for append_map in append_maps:
-            _combine_append(
-                append_map,
-                base_mnemonic=mnemonic,
-                base_result=result,
-            )
-        for name_regex_replace_map in name_regex_replace_maps:
-            _combine_name_regex_replace(
-                name_regex_replace_map,
-                base_mnemonic=mnemonic,
-                base_result=result,
+        if counters is not None:
+            counters["queue_pops"] += 1
+        if (expansions := expansions_by_result.get(result)) is not None:
+            if counters is not None:
+                counters["expansions_reused"] += 1
+        else:
+            if counters is not None:
+                counters["expansions_computed"] += 1
+            new_expansions = list[tuple[str, str, bool]]()
+            result_nfd = unicodedata.normalize("NFD", result)
+            for append_index in append_indexes:
+                _combine_append(
+                    append_index,
+                    new_expansions,
+                    base_result=result,
+                    base_result_nfd=result_nfd,
+                )
+            for name_regex_replace_map in name_regex_replace_maps:
+                _combine_name_regex_replace(
+                    name_regex_replace_map,
+                    new_expansions,
+                    base_result=result,
+                )
+            expansions = expansions_by_result[result] = new_expansions
+        for combining_mnemonic, combined_result, is_known in expansions:
+            _add(
+                mnemonic + combining_mnemonic,
+                combined_result,
+                is_known=is_known,
             )
 
     return combined_map
 
 
-def _cartesian_product(*maps: _Map, group_id: str) -> _Map:
+def expansion_reuse_info(counters: profiling.Counters) -> Any:
+    """Returns how often combining reused a result's expansions.
+
+    Args:
+        counters: Counters from generating maps.
+
+    Returns:
+        JSON-encodable report.
+    """
+    computed = counters.sum("expansions_computed")
+    reused = counters.sum("expansions_reused")
+    return dict(
+        computed=computed,
+        reused=reused,
+        reuse_rate=reused / (computed + reused) if computed + reused else 0.0,
+    )
+
+
+def _cartesian_product(
+    *maps: _Map,
+    group_id: str,
+    known_sequence_scripts: frozenset[str] | None = None,
+    counters: collections.Counter[str] | None = None,
+) -> _Map:
     """Returns the cartesian product of maps."""
+    known = known_sequences(known_sequence_scripts)
     result = _Map(group_id=group_id)
     for items in itertools.product(*(map_.all_.items() for map_ in maps)):
         mnemonic_parts = []
@@ -293,8 +590,11 @@ def _cartesian_product(*maps: _Map, group_id: str) -> _Map:
         result.add(
             "".join(mnemonic_parts),
             combined_result,
-            is_known=all(parts_known) or combined_result in known_sequences(),
+            is_known=all(parts_known) or combined_result in known,
         )
+    if counters is not None:
+        counters["product_size"] += len(result.all_)
+        counters["product_known"] += len(result.known)
     return result
 
 
@@ -334,6 +634,8 @@ class _GroupState:
     maps: _ReferenceTrackingDict[_Map]
     name_regex_replace_maps: _ReferenceTrackingDict[data.NameRegexReplaceMap]
     expressions: _ReferenceTrackingDict[_Map]
+    known_sequence_scripts: frozenset[str] | None
+    counters: profiling.Counters | None
 
 
 def _evaluate_expression(
@@ -341,11 +643,30 @@ def _evaluate_expression(
     *,
     group_id: str,
     state: _GroupState,
+    path: str,
 ) -> _Map:
-    evaluate = functools.partial(
-        _evaluate_expression,
-        group_id=group_id,
-        state=state,
+    """Evaluates an expression.
+
+    Args:
+        expression: Expression to evaluate.
+        group_id: Group the expression is in.
+        state: State of the group.
+        path: Where the expression is in the group, e.g.,
+            "expressions.main[1]", for profiling.
+    """
+
+    def evaluate(subexpression: Any, subpath: str) -> _Map:
+        return _evaluate_expression(
+            subexpression,
+            group_id=group_id,
+            state=state,
+            path=subpath,
+        )
+
+    counters = (
+        None
+        if state.counters is None
+        else state.counters.node(group_id=group_id, path=path)
     )
     match expression:
         case ["name_maps", *name_map_names] if all(
@@ -354,22 +675,25 @@ def _evaluate_expression(
             return _names_maps_to_map(
                 map(state.name_maps.get, name_map_names),
                 group_id=group_id,
+                counters=counters,
             )
         case ["map", str() as map_name]:
             return state.maps.get(map_name)
         case ["expression", str() as ref_name]:
             return state.expressions.get(ref_name)
         case ["combine", base_expr, *options]:
-            base = evaluate(base_expr)
+            base = evaluate(base_expr, f"{path}[1]")
             exclude_base = False
             append_maps = []
             name_regex_replace_maps = []
-            for option in options:
+            for option_index, option in enumerate(options, start=2):
                 match option:
                     case "exclude_base":
                         exclude_base = True
                     case ["append", append_expr]:
-                        append_maps.append(evaluate(append_expr))
+                        append_maps.append(
+                            evaluate(append_expr, f"{path}[{option_index}][1]")
+                        )
                     case ["name_regex_replace", str(map_name)]:
                         name_regex_replace_maps.append(
                             state.name_regex_replace_maps.get(map_name)
@@ -384,16 +708,23 @@ def _evaluate_expression(
                 exclude_base=exclude_base,
                 append_maps=append_maps,
                 name_regex_replace_maps=name_regex_replace_maps,
+                known_sequence_scripts=state.known_sequence_scripts,
+                counters=counters,
             )
         case ["product", *operands]:
             return _cartesian_product(
-                *map(evaluate, operands),
+                *(
+                    evaluate(operand, f"{path}[{operand_index}]")
+                    for operand_index, operand in enumerate(operands, start=1)
+                ),
                 group_id=group_id,
+                known_sequence_scripts=state.known_sequence_scripts,
+                counters=counters,
             )
         case ["union", *operands]:
             map_ = _Map(group_id=group_id)
-            for operand in operands:
-                map_.add_all(evaluate(operand))
+            for operand_index, operand in enumerate(operands, start=1):
+                map_.add_all(evaluate(operand, f"{path}[{operand_index}]"))
             return map_
         case _:
             raise ValueError(
@@ -404,6 +735,10 @@ def _evaluate_expression(
 def _generate_map_one_group(
     group_id: str,
     group: data.Group,
+    *,
+    known_sequence_scripts: frozenset[str] | None,
+    timings: profiling.Timings | None,
+    counters: profiling.Counters | None,
 ) -> Mapping[str, str]:
     """Returns a map from mnemonic to result for one group."""
     state = _GroupState(
@@ -427,6 +762,8 @@ def _generate_map_one_group(
             error_context=f"Group {group_id!r}",
             type_name="expression",
         ),
+        known_sequence_scripts=known_sequence_scripts,
+        counters=counters,
     )
 
     for map_name, map_data in group.maps.items():
@@ -435,11 +772,13 @@ def _generate_map_one_group(
             state.maps.data[map_name].add(mnemonic, result)
 
     for expression_name, expression in group.expressions.items():
-        state.expressions.data[expression_name] = _evaluate_expression(
-            expression,
-            group_id=group_id,
-            state=state,
-        )
+        with profiling.span(timings, expression_name, category="expression"):
+            state.expressions.data[expression_name] = _evaluate_expression(
+                expression,
+                group_id=group_id,
+                state=state,
+                path=f"expressions.{expression_name}",
+            )
 
     main_map = state.expressions.get("main")
 
@@ -467,35 +806,197 @@ def _generate_map_one_group(
     }
 
 
-def generate_map(groups: Mapping[str, data.Group]) -> Mapping[str, str]:
-    """Returns a map from mnemonic to result."""
-    result_and_group_id_by_mnemonic = collections.defaultdict[
-        str, list[tuple[str, str]]
-    ](list)
+def generate_group_maps(
+    groups: Mapping[str, data.Group],
+    *,
+    known_sequence_scripts: frozenset[str] | None = None,
+    timings: profiling.Timings | None = None,
+    counters: profiling.Counters | None = None,
+) -> Mapping[str, Mapping[str, str]]:
+    """Returns a map from group ID to its map from mnemonic to result.
+
+    Args:
+        groups: Groups to generate the maps from.
+        known_sequence_scripts: Argument to known_sequences(), see
+            known_sequence_scripts().
+        timings: If not None, where to record how long each group and named
+            expression takes.
+        counters: If not None, where to count the work done by each
+            expression.
+    """
+    group_maps = dict[str, Mapping[str, str]]()
     for group_id, group in groups.items():
-        for mnemonic, result in _generate_map_one_group(
-            group_id, group
-        ).items():
-            result_and_group_id_by_mnemonic[mnemonic].append((result, group_id))
-    if duplicates := {
-        k: v for k, v in result_and_group_id_by_mnemonic.items() if len(v) > 1
-    }:
+        with profiling.span(timings, group_id, category="group"):
+            group_maps[group_id] = _generate_map_one_group(
+                group_id,
+                group,
+                known_sequence_scripts=known_sequence_scripts,
+                timings=timings,
+                counters=counters,
+            )
+    return group_maps
+
+
+def _common_prefix(group_map: Mapping[str, str], /) -> str:
+    """Returns the longest prefix of all mnemonics in group_map."""
+    if not group_map:
+        return ""
+    # The common prefix of the lexicographically first and last strings is the
+    # common prefix of all of them.
+    return os.path.commonprefix([min(group_map), max(group_map)])
+
+
+def _shards(
+    group_maps: Mapping[str, Mapping[str, str]],
+) -> Sequence[Sequence[str]]:
+    """Returns shards of group IDs that might have colliding mnemonics.
+
+    Groups in different shards can't have mnemonics that are equal or prefixes
+    of each other: if one mnemonic is a prefix of another or equal to it, then
+    the common prefixes of their groups are both prefixes of the longer
+    mnemonic, so one of those common prefixes is a prefix of the other. Sorting
+    groups by common prefix puts each group right after any group whose common
+    prefix is a prefix of its own.
+    """
+    shards = list[list[str]]()
+    shard_root = None
+    for common_prefix, group_id in sorted(
+        (_common_prefix(group_map), group_id)
+        for group_id, group_map in group_maps.items()
+        if group_map
+    ):
+        if shard_root is not None and common_prefix.startswith(shard_root):
+            shards[-1].append(group_id)
+        else:
+            shards.append([group_id])
+            shard_root = common_prefix
+    return shards
+
+
+def merge_group_maps(
+    group_maps: Mapping[str, Mapping[str, str]],
+) -> Mapping[str, str]:
+    """Returns a map from mnemonic to result, sorted by result.
+
+    Args:
+        group_maps: Return value of generate_group_maps.
+
+    Raises:
+        ValueError: Multiple groups have the same mnemonic.
+    """
+    duplicates = dict[str, list[tuple[str, str]]]()
+    for shard in _shards(group_maps):
+        if len(shard) == 1:
+            continue
+        result_and_group_id_by_mnemonic = collections.defaultdict[
+            str, list[tuple[str, str]]
+        ](list)
+        for group_id in shard:
+            for mnemonic, result in group_maps[group_id].items():
+                result_and_group_id_by_mnemonic[mnemonic].append(
+                    (result, group_id)
+                )
+        duplicates.update(
+            (k, v)
+            for k, v in result_and_group_id_by_mnemonic.items()
+            if len(v) > 1
+        )
+    if duplicates:
         raise ValueError(
             "Some groups have the same mnemonics:\n"
             f"{pprint.pformat(duplicates)}"
         )
-    result_by_mnemonic = {
-        mnemonic: result
-        for mnemonic, ((result, _),) in result_and_group_id_by_mnemonic.items()
-    }
+    # Each group is sorted separately, then the sorted runs are merged. Timsort
+    # finds and merges the runs, which is much faster than heapq.merge() in
+    # Python. Comparing (result, mnemonic) tuples directly is also much faster
+    # than sorting with a key function.
+    runs = (
+        sorted((result, mnemonic) for mnemonic, result in group_map.items())
+        for group_map in group_maps.values()
+    )
     return {
         mnemonic: result
-        for mnemonic, result in sorted(
-            result_by_mnemonic.items(), key=lambda kv: (kv[1], kv[0])
-        )
+        for result, mnemonic in sorted(itertools.chain.from_iterable(runs))
     }
 
 
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class PrefixCollision:
+    """Mnemonic that's a strict prefix of a mnemonic in another group.
+
+    With m17n, typing the shorter mnemonic doesn't commit its result right
+    away, because the input method waits to see if the longer one is being
+    typed.
+
+    Attributes:
+        mnemonic: Shorter mnemonic.
+        group_id: Group of the shorter mnemonic.
+        longer_mnemonic: Longer mnemonic.
+        longer_group_id: Group of the longer mnemonic.
+    """
+
+    mnemonic: str
+    group_id: str
+    longer_mnemonic: str
+    longer_group_id: str
+
+
+def find_prefix_collisions(
+    group_maps: Mapping[str, Mapping[str, str]],
+) -> Sequence[PrefixCollision]:
+    """Returns cross-group prefix collisions, sorted by mnemonics.
+
+    Args:
+        group_maps: Return value of generate_group_maps.
+    """
+    collisions = list[PrefixCollision]()
+    for shard in _shards(group_maps):
+        if len(shard) == 1:
+            continue
+        group_id_by_mnemonic = {
+            mnemonic: group_id
+            for group_id in shard
+            for mnemonic in group_maps[group_id]
+        }
+        for longer_mnemonic, longer_group_id in group_id_by_mnemonic.items():
+            for prefix_len in range(len(longer_mnemonic)):
+                mnemonic = longer_mnemonic[:prefix_len]
+                group_id = group_id_by_mnemonic.get(mnemonic)
+                if group_id is not None and group_id != longer_group_id:
+                    collisions.append(
+                        PrefixCollision(
+                            mnemonic=mnemonic,
+                            group_id=group_id,
+                            longer_mnemonic=longer_mnemonic,
+                            longer_group_id=longer_group_id,
+                        )
+                    )
+    collisions.sort(
+        key=lambda collision: (collision.mnemonic, collision.longer_mnemonic)
+    )
+    return collisions
+
+
+def generate_map(
+    groups: Mapping[str, data.Group],
+    *,
+    timings: profiling.Timings | None = None,
+    counters: profiling.Counters | None = None,
+) -> Mapping[str, str]:
+    """Returns a map from mnemonic to result.
+
+    Args:
+        groups: Groups to generate the map from.
+        timings: If not None, where to record how long each group and named
+            expression takes.
+        counters: If not None, where to count the work done by each
+            expression.
+    """
+    return merge_group_maps(
+        generate_group_maps(groups, timings=timings, counters=counters)
+    )
+
+
 def generate_prefix_map(map_: Mapping[str, str]) -> Mapping[str, Sequence[str]]:
     """Returns a map from mnemonic prefix to matching results."""
     prefix_map = collections.defaultdict[str, set[str]](set)
@@ -505,6 +1006,26 @@ def generate_prefix_map(map_: Mapping[str, str]) -> Mapping[str, Sequence[str]]:
     return {prefix: sorted(results) for prefix, results in prefix_map.items()}
 
 
+def generate_reverse_map(
+    map_: Mapping[str, str],
+) -> Mapping[str, Sequence[str]]:
+    """Returns a map from result to mnemonics, shortest first.
+
+    Args:
+        map_: Map from mnemonic to result, sorted by result like the return
+            value of generate_map.
+    """
+    reverse_map = dict[str, Sequence[str]]()
+    for result, items in itertools.groupby(map_.items(), key=lambda kv: kv[1]):
+        if result in reverse_map:
+            raise ValueError(f"Map is not sorted by result: {result!r}")
+        reverse_map[result] = sorted(
+            (mnemonic for mnemonic, _ in items),
+            key=lambda mnemonic: (len(mnemonic), mnemonic),
+        )
+    return reverse_map
+
+
 def m17n_mtext(s: str) -> str:
     """Returns the given string as m17n MTEXT."""
     # The documentation at
@@ -537,6 +1058,8 @@ def render_template(template: str, **kwargs: Any) -> str:
         template: Template contents.
         **kwargs: Context for the template.
     """
+    import jinja2
+
     jinja_env = jinja2.Environment(
         extensions=["jinja2.ext.do"],
         undefined=jinja2.StrictUndefined,
@@ -544,3 +1067,36 @@ def render_template(template: str, **kwargs: Any) -> str:
     )
     jinja_env.filters["m17n_mtext"] = m17n_mtext
     return jinja_env.from_string(template).render(**kwargs)
+
+
+def render_m17n(
+    *,
+    map_: Mapping[str, str],
+    prefix_map: Mapping[str, Sequence[str]] | None = None,
+    name: str = "unimnim",
+    groups: Sequence[str] = (),
+) -> str:
+    """Returns an m17n input method.
+
+    Args:
+        map_: Map from mnemonic to result.
+        prefix_map: Prefix map for map_, or None to generate it.
+        name: Name of the input method.
+        groups: Group IDs to mention in the title, or empty for all groups.
+    """
+    from importlib import metadata
+
+    if prefix_map is None:
+        prefix_map = generate_prefix_map(map_)
+    return render_template(
+        (
+            resources.files("unimnim")
+            .joinpath("templates/m17n.mim.jinja")
+            .read_text()
+        ),
+        map=map_,
+        prefix_map=prefix_map,
+        version=metadata.version(typing.cast(str, __spec__.parent)),
+        name=name,
+        groups=groups,
+    )
@@ -4,11 +4,13 @@
 
 from collections.abc import Mapping, Sequence
 import re
+import unicodedata
 
 import pytest
 
 from unimnim import data
 from unimnim import input_method
+from unimnim import profiling
 
 
 @pytest.mark.parametrize(
@@ -103,6 +105,76 @@ def test_known_sequences_absent(sequence: str) -> None:
     assert sequence not in input_method.known_sequences()
 
 
+def test_known_sequences_scripts() -> None:
+    all_sequences = input_method.known_sequences()
+    greek_sequences = input_method.known_sequences(frozenset({"Grek"}))
+
+    assert greek_sequences.keys() <= all_sequences.keys()
+    assert "el" in greek_sequences["\N{GREEK SMALL LETTER ALPHA}"]
+    assert "en" not in greek_sequences["a"]
+    assert "en" in all_sequences["a"]
+    assert not any(
+        "emoji" in languages for languages in greek_sequences.values()
+    )
+
+
+@pytest.mark.parametrize(
+    "script,sequence,language",
+    (
+        ("Hrkt", "\N{HIRAGANA LETTER A}", "ja"),
+        ("Hang", "\N{HANGUL SYLLABLE GA}", "ko"),
+    ),
+)
+def test_known_sequences_scripts_not_likely_script(
+    script: str,
+    sequence: str,
+    language: str,
+) -> None:
+    # The likely scripts of Japanese and Korean are Jpan and Kore, which
+    # include other scripts.
+    assert (
+        language in input_method.known_sequences(frozenset({script}))[sequence]
+    )
+
+
+def test_precompute_known_sequences() -> None:
+    scripts = frozenset({"Cyrl"})
+
+    input_method.precompute_known_sequences(scripts)
+    cache_infos = (
+        input_method.known_sequences.cache_info(),
+        input_method._known_sequences_and_prefixes.cache_info(),
+        input_method._known_sequences_and_prefixes_nfd.cache_info(),
+    )
+    input_method.known_sequences(scripts)
+    input_method._known_sequences_and_prefixes(scripts)
+    input_method._known_sequences_and_prefixes_nfd(scripts)
+
+    assert [cache_info.misses for cache_info in cache_infos] == [
+        input_method.known_sequences.cache_info().misses,
+        input_method._known_sequences_and_prefixes.cache_info().misses,
+        input_method._known_sequences_and_prefixes_nfd.cache_info().misses,
+    ]
+
+
+@pytest.mark.parametrize(
+    "group_ids,expected",
+    (
+        ((), frozenset()),
+        (("Latn", "Grek"), frozenset({"Latn", "Grek"})),
+        (("Latn", "common/math"), None),
+        (("latin",), None),
+        (("Cyrillic",), None),
+        (("common",), None),
+    ),
+)
+def test_known_sequence_scripts(
+    group_ids: Sequence[str],
+    expected: frozenset[str] | None,
+) -> None:
+    assert input_method.known_sequence_scripts(group_ids) == expected
+
+
 @pytest.mark.parametrize(
     "known_1,known_2,expected_known",
     (
@@ -1082,6 +1154,218 @@ def test_generate_map(
     assert input_method.generate_map(groups) == expected
 
 
+@pytest.mark.parametrize(
+    "group_maps,expected",
+    (
+        ({}, {}),
+        ({"empty": {}}, {}),
+        (
+            {
+                "latin": {"la": "a", "lb": "b"},
+                "greek": {"ga": "\N{GREEK SMALL LETTER ALPHA}"},
+                "latin_extra": {"lxa": "a", "lxb": "0"},
+            },
+            {
+                "lxb": "0",
+                "la": "a",
+                "lxa": "a",
+                "lb": "b",
+                "ga": "\N{GREEK SMALL LETTER ALPHA}",
+            },
+        ),
+    ),
+)
+def test_merge_group_maps(
+    group_maps: Mapping[str, Mapping[str, str]],
+    expected: Mapping[str, str],
+) -> None:
+    actual = input_method.merge_group_maps(group_maps)
+
+    assert list(actual.items()) == list(expected.items())
+
+
+def test_merge_group_maps_duplicate_across_common_prefixes() -> None:
+    with pytest.raises(ValueError, match="groups have the same mnemonics"):
+        input_method.merge_group_maps(
+            {
+                "a": {"Za": "1", "Zb": "2"},
+                "b": {"ZAa": "3", "ZAb": "4"},
+                "c": {"ZAb": "5", "ZAc": "6"},
+                "d": {"Zz": "7"},
+            }
+        )
+
+
+def test_find_prefix_collisions() -> None:
+    assert input_method.find_prefix_collisions(
+        {
+            "control": {"ZRI": "1", "Zx": "2"},
+            "regional_indicator": {"ZRIA": "3", "ZRIB": "4"},
+            "latin": {"La": "5", "Lab": "6"},
+            "other": {"Zy": "7", "Zx1": "8"},
+        }
+    ) == [
+        input_method.PrefixCollision(
+            mnemonic="ZRI",
+            group_id="control",
+            longer_mnemonic="ZRIA",
+            longer_group_id="regional_indicator",
+        ),
+        input_method.PrefixCollision(
+            mnemonic="ZRI",
+            group_id="control",
+            longer_mnemonic="ZRIB",
+            longer_group_id="regional_indicator",
+        ),
+        input_method.PrefixCollision(
+            mnemonic="Zx",
+            group_id="control",
+            longer_mnemonic="Zx1",
+            longer_group_id="other",
+        ),
+    ]
+
+
+@pytest.mark.parametrize(
+    "base_result",
+    (
+        "",
+        "a",
+        "s",
+        "\N{LATIN SMALL LETTER A WITH ACUTE}",
+        "\N{LATIN SMALL LETTER S WITH DOT ABOVE}",
+        "\N{LATIN SMALL LETTER O WITH HORN}",
+        "\N{LATIN SMALL LETTER E WITH CIRCUMFLEX}",
+        "\N{GREEK SMALL LETTER ALPHA WITH PSILI}",
+    ),
+)
+def test_append_index_candidates_include_all_matches(base_result: str) -> None:
+    append_map = input_method._Map(group_id="test")
+    for mnemonic, combining_result in {
+        "'": "\N{COMBINING ACUTE ACCENT}",
+        "`": "\N{COMBINING GRAVE ACCENT}",
+        ".": "\N{COMBINING DOT BELOW}",
+        "*": "\N{COMBINING DOT ABOVE}",
+        "^": "\N{COMBINING CIRCUMFLEX ACCENT}",
+        "+": "\N{COMBINING HORN}",
+        ")": "\N{COMBINING COMMA ABOVE}",
+        "=": "\N{COMBINING GREEK YPOGEGRAMMENI}",
+        "b": "b",
+        "": "",
+    }.items():
+        append_map.add(mnemonic, combining_result)
+    append_index = input_method._AppendIndex.build(append_map)
+    known_and_prefixes = input_method._known_sequences_and_prefixes()
+
+    candidates = append_index.candidates(
+        unicodedata.normalize("NFD", base_result),
+        known_and_prefixes_nfd=(
+            input_method._known_sequences_and_prefixes_nfd()
+        ),
+    )
+
+    assert list(candidates) == sorted(candidates)
+    assert set(candidates) >= {
+        item_index
+        for item_index, (_, combining_result) in enumerate(append_index.items)
+        if unicodedata.normalize("NFC", base_result + combining_result)
+        in known_and_prefixes
+    }
+
+
+def test_generate_map_counters() -> None:
+    counters = profiling.Counters()
+
+    input_method.generate_map(
+        {
+            "latin": data.Group(
+                name="",
+                prefix="l",
+                name_maps=dict(
+                    letters={"a": "LATIN SMALL LETTER A", "x": "NOT A NAME"},
+                ),
+                maps=dict(
+                    combining={"'": "\N{COMBINING ACUTE ACCENT}"},
+                    suffixes={"": "", "2": "2"},
+                ),
+                expressions=dict(
+                    main=[
+                        "product",
+                        [
+                            "combine",
+                            ["name_maps", "letters"],
+                            ["append", ["map", "combining"]],
+                        ],
+                        ["map", "suffixes"],
+                    ],
+                ),
+            ),
+        },
+        counters=counters,
+    )
+
+    report = {
+        (node["file"], node["expression"]): node["counters"]
+        for node in counters.report()
+    }
+    assert report[("latin.toml", "expressions.main[1][1]")] == dict(
+        candidates=2,
+        name_lookups=2,
+        name_lookup_hits=1,
+    )
+    assert report[("latin.toml", "expressions.main[1]")] == dict(
+        append_attempts=1,
+        expansions_computed=2,
+        queue_pops=2,
+    )
+    assert report[("latin.toml", "expressions.main")] == dict(
+        product_size=4,
+        product_known=4,
+    )
+    assert input_method.expansion_reuse_info(counters) == dict(
+        computed=2,
+        reused=0,
+        reuse_rate=0.0,
+    )
+
+
+def test_generate_map_reuses_expansions() -> None:
+    counters = profiling.Counters()
+
+    map_ = input_method.generate_map(
+        {
+            "latin": data.Group(
+                name="",
+                prefix="l",
+                maps=dict(
+                    letters={"A": "a", "a": "a"},
+                    combining={"'": "\N{COMBINING ACUTE ACCENT}"},
+                ),
+                expressions=dict(
+                    main=[
+                        "combine",
+                        ["map", "letters"],
+                        ["append", ["map", "combining"]],
+                    ],
+                ),
+            ),
+        },
+        counters=counters,
+    )
+
+    assert map_ == {
+        "la": "a",
+        "lA": "a",
+        "la'": "\N{LATIN SMALL LETTER A WITH ACUTE}",
+        "lA'": "\N{LATIN SMALL LETTER A WITH ACUTE}",
+    }
+    assert input_method.expansion_reuse_info(counters) == dict(
+        computed=2,
+        reused=2,
+        reuse_rate=0.5,
+    )
+
+
 @pytest.mark.parametrize(
     "map_,expected",
     (
@@ -1121,6 +1405,17 @@ def test_generate_prefix_map(
     assert input_method.generate_prefix_map(map_) == expected
 
 
+def test_generate_reverse_map() -> None:
+    assert input_method.generate_reverse_map(
+        {"bbb": "a", "bb": "a", "ab": "a", "a": "b", "c": "c"}
+    ) == {"a": ["ab", "bb", "bbb"], "b": ["a"], "c": ["c"]}
+
+
+def test_generate_reverse_map_unsorted() -> None:
+    with pytest.raises(ValueError, match="not sorted by result"):
+        input_method.generate_reverse_map({"a": "a", "b": "b", "c": "a"})
+
+
 @pytest.mark.parametrize(
     "s,expected",
     (
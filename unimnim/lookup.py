@@ -0,0 +1,191 @@
+# SPDX-FileCopyrightText: 2025 David Mandelberg <david@mandelberg.org>
+#
+# SPDX-License-Identifier: Apache-2.0
+"""Compact binary file for looking up mnemonics without parsing.
+
+The file is designed to be used with mmap, so that a lookup only touches the
+pages it needs, and processes using the same file share memory. All integers are
+little-endian uint32. The layout is:
+
+    magic
+    mnemonic count (N)
+    result count (R)
+    first byte ranges: 257 indexes into the mnemonics, where entries i and i+1
+        are the range of mnemonics whose first UTF-8 byte is i
+    mnemonic offsets: N+1 offsets into the mnemonic pool, sorted by mnemonic
+        UTF-8 bytes
+    result indexes: N indexes into the result offsets, one for each mnemonic
+    result offsets: R+1 offsets into the result pool
+    mnemonic pool: UTF-8 mnemonics
+    result pool: UTF-8 results
+"""
+
+from collections.abc import Iterator, Mapping
+import mmap
+import os
+import pathlib
+import struct
+from typing import Self
+
+_MAGIC = b"UNIMNIM\x01"
+_UINT32 = struct.Struct("<I")
+_HEADER = struct.Struct(f"<{len(_MAGIC)}sII")
+_FIRST_BYTE_RANGES = 257
+
+
+def _pack_uint32s(values: list[int]) -> bytes:
+    return struct.pack(f"<{len(values)}I", *values)
+
+
+def serialize(map_: Mapping[str, str], /) -> bytes:
+    """Returns the binary file contents for a map from mnemonic to result."""
+    entries = sorted(
+        (mnemonic.encode(), result) for mnemonic, result in map_.items()
+    )
+    result_index_by_result = dict[str, int]()
+    result_pool = bytearray()
+    result_offsets = [0]
+    for _, result in entries:
+        if result not in result_index_by_result:
+            result_index_by_result[result] = len(result_index_by_result)
+            result_pool += result.encode()
+            result_offsets.append(len(result_pool))
+    mnemonic_pool = bytearray()
+    mnemonic_offsets = [0]
+    result_indexes = []
+    first_byte_ranges = [0] * _FIRST_BYTE_RANGES
+    for index, (mnemonic, result) in enumerate(entries):
+        mnemonic_pool += mnemonic
+        mnemonic_offsets.append(len(mnemonic_pool))
+        result_indexes.append(result_index_by_result[result])
+        if mnemonic:
+            first_byte_ranges[mnemonic[0] + 1] = index + 1
+        else:
+            first_byte_ranges[0] = index + 1
+    for i in range(1, _FIRST_BYTE_RANGES):
+        first_byte_ranges[i] = max(
+            first_byte_ranges[i], first_byte_ranges[i - 1]
+        )
+    return b"".join(
+        (
+            _HEADER.pack(_MAGIC, len(entries), len(result_index_by_result)),
+            _pack_uint32s(first_byte_ranges),
+            _pack_uint32s(mnemonic_offsets),
+            _pack_uint32s(result_indexes),
+            _pack_uint32s(result_offsets),
+            mnemonic_pool,
+            result_pool,
+        )
+    )
+
+
+class Reader:
+    """Looks up mnemonics in a binary file."""
+
+    def __init__(self, buffer: bytes | mmap.mmap) -> None:
+        """Initializer.
+
+        Args:
+            buffer: Contents of the file, see also open().
+        """
+        magic, self._count, result_count = _HEADER.unpack_from(buffer)
+        if magic != _MAGIC:
+            raise ValueError(f"Not a unimnim lookup file: {magic!r}")
+        self._buffer = buffer
+        self._first_byte_ranges = _HEADER.size
+        self._mnemonic_offsets = (
+            self._first_byte_ranges + _FIRST_BYTE_RANGES * _UINT32.size
+        )
+        self._result_indexes = (
+            self._mnemonic_offsets + (self._count + 1) * _UINT32.size
+        )
+        self._result_offsets = self._result_indexes + self._count * _UINT32.size
+        self._mnemonic_pool = (
+            self._result_offsets + (result_count + 1) * _UINT32.size
+        )
+        self._result_pool = self._mnemonic_pool + self._uint32(
+            self._mnemonic_offsets, self._count
+        )
+
+    @classmethod
+    def open(cls, path: pathlib.Path, /) -> Self:
+        """Returns a reader for a file, using mmap."""
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            return cls(mmap.mmap(fd, 0, access=mmap.ACCESS_READ))
+        finally:
+            os.close(fd)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _uint32(self, array_offset: int, index: int) -> int:
+        return _UINT32.unpack_from(
+            self._buffer, array_offset + index * _UINT32.size
+        )[0]
+
+    def _pooled(self, *, pool: int, offsets: int, index: int) -> bytes:
+        start = pool + self._uint32(offsets, index)
+        end = pool + self._uint32(offsets, index + 1)
+        return self._buffer[start:end]
+
+    def _mnemonic(self, index: int) -> bytes:
+        return self._pooled(
+            pool=self._mnemonic_pool,
+            offsets=self._mnemonic_offsets,
+            index=index,
+        )
+
+    def _result(self, index: int) -> str:
+        return self._pooled(
+            pool=self._result_pool,
+            offsets=self._result_offsets,
+            index=self._uint32(self._result_indexes, index),
+        ).decode()
+
+    def _lower_bound(self, key: bytes, *, low: int, high: int) -> int:
+        """Returns the first index in [low, high) with a mnemonic >= key."""
+        while low < high:
+            middle = (low + high) // 2
+            if self._mnemonic(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _prefix_range(self, prefix: bytes) -> tuple[int, int]:
+        """Returns the range of indexes of mnemonics starting with prefix."""
+        if not prefix:
+            return 0, self._count
+        low = self._uint32(self._first_byte_ranges, prefix[0])
+        high = self._uint32(self._first_byte_ranges, prefix[0] + 1)
+        start = self._lower_bound(prefix, low=low, high=high)
+        end = start
+        # Binary search for the end of the range, comparing only the prefix of
+        # each mnemonic.
+        end_high = high
+        while end < end_high:
+            middle = (end + end_high) // 2
+            if self._mnemonic(middle)[: len(prefix)] == prefix:
+                end = middle + 1
+            else:
+                end_high = middle
+        return start, end
+
+    def get(self, mnemonic: str) -> str | None:
+        """Returns the result of a mnemonic, or None if it doesn't exist."""
+        key = mnemonic.encode()
+        start, end = self._prefix_range(key)
+        if start < end and self._mnemonic(start) == key:
+            return self._result(start)
+        return None
+
+    def prefix(self, prefix: str) -> Iterator[tuple[str, str]]:
+        """Yields (mnemonic, result) pairs, sorted by mnemonic UTF-8 bytes.
+
+        Args:
+            prefix: Prefix that all returned mnemonics start with.
+        """
+        start, end = self._prefix_range(prefix.encode())
+        for index in range(start, end):
+            yield self._mnemonic(index).decode(), self._result(index)
@@ -0,0 +1,60 @@
+# SPDX-FileCopyrightText: 2025 David Mandelberg <david@mandelberg.org>
+#
+# SPDX-License-Identifier: Apache-2.0
+
+import pathlib
+
+import pytest
+
+from unimnim import lookup
+
+_MAP = {
+    "": "empty",
+    "a": "\N{LATIN SMALL LETTER A WITH ACUTE}",
+    "a'": "\N{LATIN SMALL LETTER A WITH ACUTE}",
+    "ab": "b",
+    "b": "\N{CALENDAR}",
+    "\N{LATIN SMALL LETTER AE}": "ae",
+}
+
+
+def test_open(tmp_path: pathlib.Path) -> None:
+    (tmp_path / "lookup.bin").write_bytes(lookup.serialize(_MAP))
+
+    reader = lookup.Reader.open(tmp_path / "lookup.bin")
+
+    assert len(reader) == len(_MAP)
+    assert reader.get("ab") == "b"
+
+
+def test_not_lookup_file() -> None:
+    with pytest.raises(ValueError, match="Not a unimnim lookup file"):
+        lookup.Reader(b"\x00" * 100)
+
+
+@pytest.mark.parametrize("mnemonic", (*_MAP, "c", "a'b", "\N{CALENDAR}"))
+def test_get(mnemonic: str) -> None:
+    reader = lookup.Reader(lookup.serialize(_MAP))
+
+    assert reader.get(mnemonic) == _MAP.get(mnemonic)
+
+
+@pytest.mark.parametrize("prefix", ("", "a", "a'", "b", "c", "\N{CALENDAR}"))
+def test_prefix(prefix: str) -> None:
+    reader = lookup.Reader(lookup.serialize(_MAP))
+
+    assert list(reader.prefix(prefix)) == sorted(
+        (
+            (mnemonic, result)
+            for mnemonic, result in _MAP.items()
+            if mnemonic.startswith(prefix)
+        ),
+        key=lambda item: item[0].encode(),
+    )
+
+
+def test_empty() -> None:
+    reader = lookup.Reader(lookup.serialize({}))
+
+    assert reader.get("a") is None
+    assert list(reader.prefix("")) == []
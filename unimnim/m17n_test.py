@@ -15,8 +15,8 @@ import pytest
 
 from unimnim import input_method
 
-_PROMPT = "[prompt]"
-_SEARCH_PREFIX_PROMPT = "[search-prefix-prompt]"
+PROMPT = "[prompt]"
+SEARCH_PREFIX_PROMPT = "[search-prefix-prompt]"
 
 _START = ("A-\\",)
 _SEARCH_PREFIX_START = ("A-\\", "A-\\")
@@ -42,6 +42,216 @@ def _param(
     )
 
 
+# These are also used by runtime_test.py, to make sure the behavior matches.
+CASES = (
+    _param(
+        "no_command",
+        map_={"a": "b"},
+        keys=("a",),
+        commit="a",
+    ),
+    _param(
+        "map_start",
+        map_={"a": "b"},
+        keys=_START,
+        preedit=PROMPT,
+    ),
+    _param(
+        "map_invalid_key",
+        map_={"a": "b"},
+        keys=(*_START, "c"),
+        commit="c",
+    ),
+    _param(
+        "map_done",
+        map_={"a": "b"},
+        keys=(*_START, "a"),
+        commit="b",
+    ),
+    _param(
+        "map_done_then_mnemonic_without_command",
+        map_={"a": "b"},
+        keys=(*_START, "a", "a"),
+        commit="ba",
+    ),
+    _param(
+        "map_prefix",
+        map_={"aa": "bb"},
+        keys=(*_START, "a"),
+        preedit=f"{PROMPT}a",
+    ),
+    _param(
+        "map_prefix_then_invalid_key",
+        map_={"aa": "bb"},
+        keys=(*_START, "a", "c"),
+        commit="ac",
+    ),
+    _param(
+        "map_prefix_then_unrelated_prefix",
+        map_={"aa": "bb", "cc": "dd"},
+        keys=(*_START, "a", "c"),
+        commit="ac",
+    ),
+    _param(
+        "map_prefix_then_new_command",
+        map_={"aa": "bb"},
+        keys=(*_START, "a", *_START, "a", "a"),
+        commit="abb",
+    ),
+    _param(
+        "map_prefix_then_done",
+        map_={"aa": "bb"},
+        keys=(*_START, "a", "a"),
+        commit="bb",
+    ),
+    _param(
+        "map_done_and_prefix",
+        map_={"a": "b", "aa": "c"},
+        keys=(*_START, "a"),
+        preedit="b",
+    ),
+    _param(
+        "map_done_and_prefix_then_invalid_key",
+        map_={"a": "b", "aa": "c"},
+        keys=(*_START, "a", "d"),
+        commit="bd",
+    ),
+    _param(
+        "map_done_and_prefix_then_longer_prefix_then_invalid_key",
+        map_={"a": "b", "aaa": "c"},
+        keys=(*_START, "a", "a", "d"),
+        commit="aad",
+    ),
+    _param(
+        "map_done_and_prefix_then_unrelated_prefix",
+        map_={"a": "b", "aa": "c", "dd": "e"},
+        keys=(*_START, "a", "f"),
+        commit="bf",
+    ),
+    _param(
+        "map_done_and_prefix_then_new_command",
+        map_={"a": "b", "aa": "c"},
+        keys=(*_START, "a", *_START, "a", "a"),
+        commit="bc",
+    ),
+    _param(
+        "map_done_and_prefix_then_done",
+        map_={"a": "b", "aa": "c"},
+        keys=(*_START, "a", "a"),
+        commit="c",
+    ),
+    _param(
+        "search_prefix_start",
+        map_={"aa": "b", "bb": "a"},
+        keys=_SEARCH_PREFIX_START,
+        candidates=(),
+        preedit=SEARCH_PREFIX_PROMPT,
+    ),
+    _param(
+        "search_prefix_invalid_key",
+        map_={"a": "b"},
+        keys=(*_SEARCH_PREFIX_START, "c"),
+        commit="c",
+    ),
+    _param(
+        "search_prefix_done",
+        map_={"a": "b"},
+        keys=(*_SEARCH_PREFIX_START, "a"),
+        candidates=("b",),
+        preedit="b",
+    ),
+    _param(
+        "search_prefix_done_then_invalid_key",
+        map_={"a": "b"},
+        keys=(*_SEARCH_PREFIX_START, "a", "c"),
+        commit="bc",
+    ),
+    _param(
+        "search_prefix_done_then_new_command",
+        map_={"a": "b", "c": "d"},
+        keys=(*_SEARCH_PREFIX_START, "a", *_SEARCH_PREFIX_START, "c"),
+        commit="b",
+        candidates=("d",),
+        preedit="d",
+    ),
+    _param(
+        "search_prefix_prefix",
+        map_={"aa": "bb"},
+        keys=(*_SEARCH_PREFIX_START, "a"),
+        candidates=("bb",),
+        preedit="bb",
+    ),
+    _param(
+        "search_prefix_prefix_then_invalid_key",
+        map_={"aa": "bb"},
+        keys=(*_SEARCH_PREFIX_START, "a", "c"),
+        commit="bbc",
+    ),
+    _param(
+        "search_prefix_prefix_then_unrelated_prefix",
+        map_={"aa": "bb", "cc": "dd"},
+        keys=(*_SEARCH_PREFIX_START, "a", "c"),
+        commit="bbc",
+    ),
+    _param(
+        "search_prefix_prefix_then_new_command",
+        map_={"aa": "bb"},
+        keys=(*_SEARCH_PREFIX_START, "a", *_SEARCH_PREFIX_START, "a"),
+        commit="bb",
+        candidates=("bb",),
+        preedit="bb",
+    ),
+    _param(
+        "search_prefix_prefix_then_done",
+        map_={"aa": "bb"},
+        keys=(*_SEARCH_PREFIX_START, "a", "a"),
+        candidates=("bb",),
+        preedit="bb",
+    ),
+    _param(
+        "search_prefix_done_and_prefix",
+        map_={"a": "b", "aa": "c"},
+        keys=(*_SEARCH_PREFIX_START, "a"),
+        candidates=("b", "c"),
+        preedit="b",
+    ),
+    _param(
+        "search_prefix_done_and_prefix_then_invalid_key",
+        map_={"a": "b", "aa": "c"},
+        keys=(*_SEARCH_PREFIX_START, "a", "d"),
+        commit="bd",
+    ),
+    _param(
+        "search_prefix_done_and_prefix_then_unrelated_prefix",
+        map_={"a": "b", "aa": "c", "dd": "e"},
+        keys=(*_SEARCH_PREFIX_START, "a", "f"),
+        commit="bf",
+    ),
+    _param(
+        "search_prefix_done_and_prefix_then_new_command",
+        map_={"a": "b", "aa": "c"},
+        keys=(*_SEARCH_PREFIX_START, "a", *_SEARCH_PREFIX_START, "a", "a"),
+        commit="b",
+        candidates=("c",),
+        preedit="c",
+    ),
+    _param(
+        "search_prefix_done_and_prefix_then_done",
+        map_={"a": "b", "aa": "c"},
+        keys=(*_SEARCH_PREFIX_START, "a", "a"),
+        candidates=("c",),
+        preedit="c",
+    ),
+    _param(
+        "search_prefix_truncated_candidate_list",
+        map_={f"a{i:04d}": f"b{i:04d}" for i in range(1001)},
+        keys=(*_SEARCH_PREFIX_START, "a"),
+        candidates=tuple(f"b{i:04d}" for i in range(1000)),
+        preedit="b0000",
+    ),
+)
+
+
 @pytest.mark.parametrize(
     ",".join(
         (
@@ -52,213 +262,7 @@ def _param(
             "preedit",
         )
     ),
-    (
-        _param(
-            "no_command",
-            map_={"a": "b"},
-            keys=("a",),
-            commit="a",
-        ),
-        _param(
-            "map_start",
-            map_={"a": "b"},
-            keys=_START,
-            preedit=_PROMPT,
-        ),
-        _param(
-            "map_invalid_key",
-            map_={"a": "b"},
-            keys=(*_START, "c"),
-            commit="c",
-        ),
-        _param(
-            "map_done",
-            map_={"a": "b"},
-            keys=(*_START, "a"),
-            commit="b",
-        ),
-        _param(
-            "map_done_then_mnemonic_without_command",
-            map_={"a": "b"},
-            keys=(*_START, "a", "a"),
-            commit="ba",
-        ),
-        _param(
-            "map_prefix",
-            map_={"aa": "bb"},
-            keys=(*_START, "a"),
-            preedit=f"{_PROMPT}a",
-        ),
-        _param(
-            "map_prefix_then_invalid_key",
-            map_={"aa": "bb"},
-            keys=(*_START, "a", "c"),
-            commit="ac",
-        ),
-        _param(
-            "map_prefix_then_unrelated_prefix",
-            map_={"aa": "bb", "cc": "dd"},
-            keys=(*_START, "a", "c"),
-            commit="ac",
-        ),
-        _param(
-            "map_prefix_then_new_command",
-            map_={"aa": "bb"},
-            keys=(*_START, "a", *_START, "a", "a"),
-            commit="abb",
-        ),
-        _param(
-            "map_prefix_then_done",
-            map_={"aa": "bb"},
-            keys=(*_START, "a", "a"),
-            commit="bb",
-        ),
-        _param(
-            "map_done_and_prefix",
-            map_={"a": "b", "aa": "c"},
-            keys=(*_START, "a"),
-            preedit="b",
-        ),
-        _param(
-            "map_done_and_prefix_then_invalid_key",
-            map_={"a": "b", "aa": "c"},
-            keys=(*_START, "a", "d"),
-            commit="bd",
-        ),
-        _param(
-            "map_done_and_prefix_then_longer_prefix_then_invalid_key",
-            map_={"a": "b", "aaa": "c"},
-            keys=(*_START, "a", "a", "d"),
-            commit="aad",
-        ),
-        _param(
-            "map_done_and_prefix_then_unrelated_prefix",
-            map_={"a": "b", "aa": "c", "dd": "e"},
-            keys=(*_START, "a", "f"),
-            commit="bf",
-        ),
-        _param(
-            "map_done_and_prefix_then_new_command",
-            map_={"a": "b", "aa": "c"},
-            keys=(*_START, "a", *_START, "a", "a"),
-            commit="bc",
-        ),
-        _param(
-            "map_done_and_prefix_then_done",
-            map_={"a": "b", "aa": "c"},
-            keys=(*_START, "a", "a"),
-            commit="c",
-        ),
-        _param(
-            "search_prefix_start",
-            map_={"aa": "b", "bb": "a"},
-            keys=_SEARCH_PREFIX_START,
-            candidates=(),
-            preedit=_SEARCH_PREFIX_PROMPT,
-        ),
-        _param(
-            "search_prefix_invalid_key",
-            map_={"a": "b"},
-            keys=(*_SEARCH_PREFIX_START, "c"),
-            commit="c",
-        ),
-        _param(
-            "search_prefix_done",
-            map_={"a": "b"},
-            keys=(*_SEARCH_PREFIX_START, "a"),
-            candidates=("b",),
-            preedit="b",
-        ),
-        _param(
-            "search_prefix_done_then_invalid_key",
-            map_={"a": "b"},
-            keys=(*_SEARCH_PREFIX_START, "a", "c"),
-            commit="bc",
-        ),
-        _param(
-            "search_prefix_done_then_new_command",
-            map_={"a": "b", "c": "d"},
-            keys=(*_SEARCH_PREFIX_START, "a", *_SEARCH_PREFIX_START, "c"),
-            commit="b",
-            candidates=("d",),
-            preedit="d",
-        ),
-        _param(
-            "search_prefix_prefix",
-            map_={"aa": "bb"},
-            keys=(*_SEARCH_PREFIX_START, "a"),
-            candidates=("bb",),
-            preedit="bb",
-        ),
-        _param(
-            "search_prefix_prefix_then_invalid_key",
-            map_={"aa": "bb"},
-            keys=(*_SEARCH_PREFIX_START, "a", "c"),
-            commit="bbc",
-        ),
-        _param(
-            "search_prefix_prefix_then_unrelated_prefix",
-            map_={"aa": "bb", "cc": "dd"},
-            keys=(*_SEARCH_PREFIX_START, "a", "c"),
-            commit="bbc",
-        ),
-        _param(
-            "search_prefix_prefix_then_new_command",
-            map_={"aa": "bb"},
-            keys=(*_SEARCH_PREFIX_START, "a", *_SEARCH_PREFIX_START, "a"),
-            commit="bb",
-            candidates=("bb",),
-            preedit="bb",
-        ),
-        _param(
-            "search_prefix_prefix_then_done",
-            map_={"aa": "bb"},
-            keys=(*_SEARCH_PREFIX_START, "a", "a"),
-            candidates=("bb",),
-            preedit="bb",
-        ),
-        _param(
-            "search_prefix_done_and_prefix",
-            map_={"a": "b", "aa": "c"},
-            keys=(*_SEARCH_PREFIX_START, "a"),
-            candidates=("b", "c"),
-            preedit="b",
-        ),
-        _param(
-            "search_prefix_done_and_prefix_then_invalid_key",
-            map_={"a": "b", "aa": "c"},
-            keys=(*_SEARCH_PREFIX_START, "a", "d"),
-            commit="bd",
-        ),
-        _param(
-            "search_prefix_done_and_prefix_then_unrelated_prefix",
-            map_={"a": "b", "aa": "c", "dd": "e"},
-            keys=(*_SEARCH_PREFIX_START, "a", "f"),
-            commit="bf",
-        ),
-        _param(
-            "search_prefix_done_and_prefix_then_new_command",
-            map_={"a": "b", "aa": "c"},
-            keys=(*_SEARCH_PREFIX_START, "a", *_SEARCH_PREFIX_START, "a", "a"),
-            commit="b",
-            candidates=("c",),
-            preedit="c",
-        ),
-        _param(
-            "search_prefix_done_and_prefix_then_done",
-            map_={"a": "b", "aa": "c"},
-            keys=(*_SEARCH_PREFIX_START, "a", "a"),
-            candidates=("c",),
-            preedit="c",
-        ),
-        _param(
-            "search_prefix_truncated_candidate_list",
-            map_={f"a{i:04d}": f"b{i:04d}" for i in range(1001)},
-            keys=(*_SEARCH_PREFIX_START, "a"),
-            candidates=tuple(f"b{i:04d}" for i in range(1000)),
-            preedit="b0000",
-        ),
-    ),
+    CASES,
 )
 def test_m17n_input_method(
     map_: Mapping[str, str],
@@ -278,15 +282,17 @@ def test_m17n_input_method(
             map=map_,
             prefix_map=input_method.generate_prefix_map(map_),
             version="no-version-test-only",
+            name="unimnim",
+            groups=(),
         )
     )
     (tmp_path / "config.mic").write_text(textwrap.dedent(f"""
         ((input-method t unimnim)
          (variable
-          (prompt nil {input_method.m17n_mtext(_PROMPT)})
+          (prompt nil {input_method.m17n_mtext(PROMPT)})
           (search-prefix-prompt
            nil
-           {input_method.m17n_mtext(_SEARCH_PREFIX_PROMPT)})
+           {input_method.m17n_mtext(SEARCH_PREFIX_PROMPT)})
           )
          )
     """))
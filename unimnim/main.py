@@ -4,23 +4,176 @@
 """Main entrypoint."""
 
 import argparse
-from collections.abc import Sequence
-from importlib import metadata
+from collections.abc import Callable, Collection, Iterator, Mapping, Sequence
+import concurrent.futures
+import contextlib
+import dataclasses
 from importlib import resources
+import itertools
 import json
+import multiprocessing
+import os
 import pathlib
+import re
 import sys
 import textwrap
+import time
+import traceback
 import typing
-from typing import Any
+from typing import Any, Self
 
 from unimnim import coverage
 from unimnim import data
 from unimnim import input_method
+from unimnim import lookup
+from unimnim import name_index
+from unimnim import profiling
+
+
+def _json_text(data: Any) -> str:
+    return json.dumps(data, ensure_ascii=False, indent=2)
 
 
 def _write_json(path: pathlib.Path, data: Any) -> None:
-    path.write_text(json.dumps(data, ensure_ascii=False, indent=2))
+    path.write_text(_json_text(data))
+
+
+# Writing is mostly waiting on I/O, so a few threads are enough to keep up
+# with generating the outputs.
+_WRITE_THREADS = 4
+
+
+class _OutputWriter:
+    """Writes output files in the background.
+
+    Serializing and writing happen in a bounded thread pool, so that they
+    overlap with generating the rest of the outputs. Files are written to a
+    temporary file and then renamed, so that readers, e.g., `unimnim serve`,
+    never see partially written files. Leaving the context waits for all the
+    writes, then writes any files from write_json_last() if the others
+    succeeded, and raises an ExceptionGroup of any that failed. Each write is
+    timed in the thread that does it, so the stages that queue writes don't
+    include the time to write.
+    """
+
+    def __init__(
+        self,
+        *,
+        skip_unchanged: bool = False,
+        max_workers: int = _WRITE_THREADS,
+        timings: profiling.Timings | None = None,
+    ) -> None:
+        """Initializer.
+
+        Args:
+            skip_unchanged: Whether to leave files alone if they already have
+                the right contents.
+            max_workers: Maximum number of threads to write with.
+            timings: See profiling.Timings.
+        """
+        self._skip_unchanged = skip_unchanged
+        self._timings = timings
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="unimnim-write",
+        )
+        self._temp_ids = itertools.count()
+        self._pending = list[
+            tuple[pathlib.Path, concurrent.futures.Future[None]]
+        ]()
+        self._last = list[tuple[pathlib.Path, Callable[[], bytes]]]()
+        self.written = list[pathlib.Path]()
+        self.unchanged = list[pathlib.Path]()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Waits for all writes, and raises any errors."""
+        self._executor.shutdown()
+        errors = list[Exception]()
+        for path, future in self._pending:
+            if (error := future.exception()) is not None:
+                error.add_note(f"While writing {path}")
+                errors.append(typing.cast(Exception, error))
+        self._pending.clear()
+        if not errors:
+            for path, render in self._last:
+                try:
+                    self._write(path, render)
+                except Exception as error:
+                    error.add_note(f"While writing {path}")
+                    errors.append(error)
+        self._last.clear()
+        if errors:
+            raise ExceptionGroup("Failed to write outputs", errors)
+
+    def _write(self, path: pathlib.Path, render: Callable[[], bytes]) -> None:
+        with profiling.span(self._timings, path.name, category="write"):
+            contents = render()
+            if self._skip_unchanged:
+                try:
+                    if path.read_bytes() == contents:
+                        self.unchanged.append(path)
+                        return
+                except FileNotFoundError:
+                    pass
+            # Readers might have the old file mapped, e.g., lookup.bin, and
+            # overwriting it in place could crash them, so this writes a new
+            # file and renames it over the old one. The ID keeps concurrent
+            # writes to the same path from sharing a temporary file.
+            temp_path = path.with_name(
+                f".{path.name}.{next(self._temp_ids)}.tmp"
+            )
+            try:
+                temp_path.write_bytes(contents)
+                temp_path.replace(path)
+            except BaseException:
+                temp_path.unlink(missing_ok=True)
+                raise
+            self.written.append(path)
+
+    def _submit(self, path: pathlib.Path, render: Callable[[], bytes]) -> None:
+        self._pending.append(
+            (path, self._executor.submit(self._write, path, render))
+        )
+
+    def write_bytes(self, path: pathlib.Path, contents: bytes) -> None:
+        self._submit(path, lambda: contents)
+
+    def write_text(self, path: pathlib.Path, text: str) -> None:
+        self._submit(path, text.encode)
+
+    def write_json(self, path: pathlib.Path, data: Any) -> None:
+        self._submit(path, lambda: _json_text(data).encode())
+
+    def write_json_last(
+        self, path: pathlib.Path, data: Callable[[], Any]
+    ) -> None:
+        """Writes JSON after all other files, e.g., a manifest of them.
+
+        Args:
+            path: File to write.
+            data: Returns the JSON-encodable data to write. It's called after
+                the other files are written.
+        """
+        self._last.append((path, lambda: _json_text(data()).encode()))
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class _Build:
+    """Intermediate data from generating everything, for reuse.
+
+    Attributes:
+        groups: Return value of data.load().
+        group_maps: Return value of input_method.generate_group_maps().
+    """
+
+    groups: Mapping[str, data.Group]
+    group_maps: Mapping[str, Mapping[str, str]]
 
 
 def main(
@@ -43,70 +196,653 @@ def main(
         type=pathlib.Path,
         help="File to write unimnim.mim to.",
     )
+    parser.add_argument(
+        "--groups",
+        type=lambda groups: groups.split(","),
+        metavar="GROUP,...",
+        help=(
+            "Only load and generate these groups, e.g., Latn,Grek,common/math. "
+            "All outputs only have these groups."
+        ),
+    )
+    parser.add_argument(
+        "--write-m17n-groups",
+        type=pathlib.Path,
+        help=(
+            "Directory to write smaller m17n input methods to, with only some "
+            "groups in each. By default, there's one per group, e.g., "
+            "unimnim-latn.mim and unimnim-common-math.mim. See also "
+            "--m17n-group-set."
+        ),
+    )
+    parser.add_argument(
+        "--m17n-group-set",
+        action="append",
+        metavar="NAME=GROUP,...",
+        help=(
+            "Instead of one input method per group, write one with the given "
+            "groups, e.g., latin-greek=Latn,Grek for unimnim-latin-greek.mim. "
+            "Can be specified multiple times."
+        ),
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=pathlib.Path,
+        help=(
+            "Directory to cache validated data files in, so that unchanged "
+            "files don't need to be parsed and validated again."
+        ),
+    )
+    parser.add_argument(
+        "--revalidate",
+        action="store_true",
+        help="Parse and validate all data files even if they're cached.",
+    )
+    parser.add_argument(
+        "--timings",
+        type=pathlib.Path,
+        help=(
+            "Directory to write timing information to, as a summary "
+            "(timings.json) and as Chrome trace events (trace.json)."
+        ),
+    )
+    parser.add_argument(
+        "--counters",
+        type=pathlib.Path,
+        help=(
+            "File to write a report of how much work each expression in the "
+            "data does, and how well parsing and expansion caches work, to."
+        ),
+    )
+    parser.add_argument(
+        "--memory-profile",
+        type=pathlib.Path,
+        help=(
+            "File to write a report of memory use after each stage to. This "
+            "makes everything much slower."
+        ),
+    )
+    subparsers = parser.add_subparsers(
+        dest="command",
+        description=(
+            "Without a command, generates the input method and other files."
+        ),
+    )
+    query_parser = subparsers.add_parser(
+        "query",
+        help="Look up a mnemonic in lookup.bin from --write-all.",
+    )
+    query_parser.add_argument(
+        "--lookup",
+        type=pathlib.Path,
+        required=True,
+        help="lookup.bin file to use.",
+    )
+    query_parser.add_argument(
+        "--prefix",
+        action="store_true",
+        help="Show all mnemonics that start with MNEMONIC.",
+    )
+    query_parser.add_argument("mnemonic", metavar="MNEMONIC")
+    search_parser = subparsers.add_parser(
+        "search",
+        help="Search for results by the words in their Unicode names.",
+    )
+    search_parser.add_argument(
+        "--output-dir",
+        type=pathlib.Path,
+        required=True,
+        help="Directory that was used with --write-all.",
+    )
+    search_parser.add_argument("words", metavar="WORD", nargs="+")
+    serve_parser = subparsers.add_parser(
+        "serve",
+        help=(
+            "Answer lookups over a Unix domain socket. See serve.py for the "
+            "protocol."
+        ),
+    )
+    serve_parser.add_argument(
+        "--output-dir",
+        type=pathlib.Path,
+        required=True,
+        help=(
+            "Directory that was used with --write-all. The server reloads when "
+            "files in it change."
+        ),
+    )
+    serve_parser.add_argument(
+        "--socket",
+        type=pathlib.Path,
+        required=True,
+        help="Unix domain socket to listen on.",
+    )
+    serve_parser.add_argument(
+        "--reload-interval",
+        type=float,
+        default=1.0,
+        help="How often to check for changed files, in seconds.",
+    )
+    watch_parser = subparsers.add_parser(
+        "watch",
+        help=(
+            "Generate everything like without a command, then keep running "
+            "and regenerate whenever a data file changes. Only groups that "
+            "changed are re-evaluated, and only outputs that changed are "
+            "rewritten."
+        ),
+    )
+    watch_parser.add_argument(
+        "--interval",
+        type=float,
+        default=0.5,
+        help="How often to check for changed data files, in seconds.",
+    )
     parsed_args = parser.parse_args(args)
 
+    match parsed_args.command:
+        case None:
+            _generate(parsed_args)
+        case "query":
+            _query(parsed_args)
+        case "search":
+            _search(parsed_args)
+        case "watch":
+            _watch(parsed_args)
+        case "serve":
+            _serve(parsed_args)
+
+
+def _query(parsed_args: argparse.Namespace) -> None:
+    reader = lookup.Reader.open(parsed_args.lookup)
+    if parsed_args.prefix:
+        for mnemonic, prefix_result in reader.prefix(parsed_args.mnemonic):
+            print(f"{mnemonic}\t{prefix_result}")
+    elif (result := reader.get(parsed_args.mnemonic)) is not None:
+        print(result)
+    else:
+        sys.exit(f"No such mnemonic: {parsed_args.mnemonic!r}")
+
+
+def _search(parsed_args: argparse.Namespace) -> None:
+    index = name_index.NameIndex.from_json(
+        json.loads((parsed_args.output_dir / "name_index.json").read_text())
+    )
+    reverse_map = json.loads(
+        (parsed_args.output_dir / "reverse_map.json").read_text()
+    )
+    for result in index.search(" ".join(parsed_args.words)):
+        print(f"{result}\t{' '.join(reverse_map[result])}")
+
+
+def _generate(parsed_args: argparse.Namespace) -> None:
+    timings = profiling.Timings() if parsed_args.timings is not None else None
+    counters = (
+        profiling.Counters() if parsed_args.counters is not None else None
+    )
+    memory_profile = (
+        profiling.MemoryProfile()
+        if parsed_args.memory_profile is not None
+        else None
+    )
+    try:
+        with (
+            profiling.span(timings, "main", category="main"),
+            resources.as_file(
+                resources.files("unimnim").joinpath("data")
+            ) as data_path,
+            _OutputWriter(timings=timings) as writer,
+        ):
+            _generate_stages(
+                parsed_args,
+                data_path=data_path,
+                writer=writer,
+                timings=timings,
+                counters=counters,
+                memory_profile=memory_profile,
+            )
+    finally:
+        if memory_profile is not None:
+            memory_profile.stop()
+
+    if timings is not None:
+        parsed_args.timings.mkdir(exist_ok=True)
+        _write_json(parsed_args.timings / "timings.json", timings.summary())
+        _write_json(parsed_args.timings / "trace.json", timings.trace_events())
+    if counters is not None:
+        _write_json(
+            parsed_args.counters,
+            dict(
+                expressions=counters.report(),
+                parse_caches=data.parse_cache_info(),
+                expansion_reuse=input_method.expansion_reuse_info(counters),
+            ),
+        )
+    if memory_profile is not None:
+        _write_json(parsed_args.memory_profile, memory_profile.report())
+
+
+def _generate_stages(
+    parsed_args: argparse.Namespace,
+    *,
+    data_path: pathlib.Path,
+    writer: _OutputWriter,
+    timings: profiling.Timings | None = None,
+    counters: profiling.Counters | None = None,
+    memory_profile: profiling.MemoryProfile | None = None,
+    previous: _Build | None = None,
+) -> _Build:
+    """Generates everything.
+
+    Args:
+        parsed_args: Command line arguments.
+        data_path: Directory of data files.
+        writer: Writer for outputs.
+        timings: See profiling.Timings.
+        counters: See profiling.Counters.
+        memory_profile: See profiling.MemoryProfile.
+        previous: Return value of the previous call in the same process, if
+            any. Groups that are unchanged since then are not re-evaluated,
+            and known sequences are not written again.
+
+    Returns:
+        Intermediate data, for use with the previous argument.
+    """
+
+    @contextlib.contextmanager
+    def _stage(name: str) -> Iterator[None]:
+        with (
+            profiling.span(timings, name, category="stage"),
+            profiling.memory_stage(memory_profile, name),
+        ):
+            yield
+
     if parsed_args.write_all is not None:
         parsed_args.write_all.mkdir(exist_ok=True)
 
-    with resources.as_file(
-        resources.files("unimnim").joinpath("data")
-    ) as data_path:
-        data_ = data.load(data_path)
+    # The known sequences can be generated faster for groups that are all
+    # scripts.
+    known_sequence_scripts = (
+        None
+        if parsed_args.groups is None
+        else input_method.known_sequence_scripts(parsed_args.groups)
+    )
+
+    # Known sequences don't depend on the data, so they're computed while the
+    # data is loading.
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        known_sequences_future = executor.submit(
+            input_method.precompute_known_sequences, known_sequence_scripts
+        )
+        with _stage("load_data"):
+            data_ = data.load(
+                data_path,
+                group_ids=parsed_args.groups,
+                cache_dir=parsed_args.cache_dir,
+                revalidate=parsed_args.revalidate,
+            )
+        if previous is not None and data_ == previous.groups:
+            # Everything else is derived from the data, so nothing changed.
+            return previous
+        with _stage("known_sequences"):
+            known_sequences_future.result()
+    if parsed_args.write_all is not None and previous is None:
+        with _stage("queue_known_sequences"):
+            _write_known_sequences(
+                writer, parsed_args.write_all, scripts=known_sequence_scripts
+            )
+
+    with _stage("generate_map"):
+        changed_groups = {
+            group_id: group
+            for group_id, group in data_.items()
+            if previous is None or previous.groups.get(group_id) != group
+        }
+        changed_group_maps = input_method.generate_group_maps(
+            changed_groups,
+            known_sequence_scripts=known_sequence_scripts,
+            timings=timings,
+            counters=counters,
+        )
+        group_maps = {
+            group_id: (
+                changed_group_maps[group_id]
+                if group_id in changed_groups
+                else typing.cast(_Build, previous).group_maps[group_id]
+            )
+            for group_id in data_
+        }
+        map_ = input_method.merge_group_maps(group_maps)
+    if parsed_args.write_all is not None:
+        with _stage("queue_prefix_collisions"):
+            writer.write_json(
+                parsed_args.write_all / "prefix_collisions.json",
+                [
+                    dataclasses.asdict(collision)
+                    for collision in input_method.find_prefix_collisions(
+                        group_maps
+                    )
+                ],
+            )
+    if parsed_args.write_all is not None:
+        with _stage("queue_map"):
+            writer.write_json(parsed_args.write_all / "map.json", map_)
+        with _stage("queue_lookup"):
+            writer.write_bytes(
+                parsed_args.write_all / "lookup.bin", lookup.serialize(map_)
+            )
 
+    with _stage("generate_reverse_map"):
+        reverse_map = input_method.generate_reverse_map(map_)
     if parsed_args.write_all is not None:
-        _write_json(
-            parsed_args.write_all / "known_sequences.json",
-            input_method.known_sequences(),
+        with _stage("queue_reverse_map"):
+            writer.write_json(
+                parsed_args.write_all / "reverse_map.json", reverse_map
+            )
+
+    if parsed_args.write_all is not None:
+        with _stage("queue_name_index"):
+            writer.write_json(
+                parsed_args.write_all / "name_index.json",
+                name_index.NameIndex.build(
+                    reverse_map, aliases=data.aliases(data_.values())
+                ).to_json(),
+            )
+        # serve imports asyncio, which is slow to import.
+        from unimnim import serve
+
+        # This is written last so that `unimnim serve` doesn't reload until
+        # the files it uses are all from the same build.
+        writer.write_json_last(
+            parsed_args.write_all / serve.MANIFEST,
+            lambda: serve.manifest(parsed_args.write_all),
         )
-        with (parsed_args.write_all / "known_sequences.toml").open("w") as f:
-            f.write(textwrap.dedent("""\
-                # This file is intended to help with starting a new data file.
-                # Note that there might be syntax errors, combining characters
-                # aren't represented with `[combining]`, and it might need other
-                # manual changes.
-            """))
-            for sequence in sorted(input_method.known_sequences()):
-                f.write(f'"" = "{data.to_explicit_string(sequence)}"\n')
-
-    map_ = input_method.generate_map(data_)
+
+    with _stage("generate_prefix_map"):
+        prefix_map = input_method.generate_prefix_map(map_)
+    if parsed_args.write_all is not None:
+        with _stage("queue_prefix_map"):
+            writer.write_json(
+                parsed_args.write_all / "prefix_map.json", prefix_map
+            )
+
+    with _stage("render_m17n"):
+        m17n_mim = input_method.render_m17n(
+            map_=map_,
+            prefix_map=prefix_map,
+            name="unimnim",
+            groups=(),
+        )
+    with _stage("queue_m17n"):
+        if parsed_args.write_all is not None:
+            writer.write_text(parsed_args.write_all / "unimnim.mim", m17n_mim)
+        if parsed_args.write_m17n is not None:
+            writer.write_text(parsed_args.write_m17n, m17n_mim)
+
+    if parsed_args.write_m17n_groups is not None:
+        with _stage("render_m17n_groups"):
+            m17n_group_mims = _render_m17n_groups(
+                group_maps,
+                group_sets=_parse_m17n_group_sets(
+                    parsed_args.m17n_group_set, group_ids=group_maps.keys()
+                ),
+            )
+        with _stage("queue_m17n_groups"):
+            parsed_args.write_m17n_groups.mkdir(exist_ok=True)
+            for name, mim in m17n_group_mims.items():
+                writer.write_text(
+                    parsed_args.write_m17n_groups / f"{name}.mim", mim
+                )
+
     if parsed_args.write_all is not None:
-        _write_json(parsed_args.write_all / "map.json", map_)
+        with _stage("queue_examples"):
+            writer.write_text(
+                parsed_args.write_all / "examples.html",
+                input_method.render_template(
+                    (
+                        resources.files("unimnim")
+                        .joinpath("templates/examples.html.jinja")
+                        .read_text()
+                    ),
+                    data=data_,
+                ),
+            )
 
-    prefix_map = input_method.generate_prefix_map(map_)
     if parsed_args.write_all is not None:
-        _write_json(parsed_args.write_all / "prefix_map.json", prefix_map)
+        with _stage("queue_coverage"):
+            writer.write_json(
+                parsed_args.write_all / "coverage.json",
+                coverage.report(
+                    covered=frozenset(map_.values()),
+                    known_sequence_scripts=known_sequence_scripts,
+                ),
+            )
+            writer.write_json(
+                parsed_args.write_all / "coverage_by_group.json",
+                coverage.report_by_group(
+                    group_maps=group_maps,
+                    known_sequence_scripts=known_sequence_scripts,
+                ),
+            )
+
+    return _Build(groups=data_, group_maps=group_maps)
+
+
+def _m17n_name(group_set_name: str) -> str:
+    return "unimnim-" + re.sub(r"[^a-z0-9]+", "-", group_set_name.lower())
 
-    m17n_mim = input_method.render_template(
+
+def _parse_m17n_group_sets(
+    raw: Sequence[str] | None,
+    *,
+    group_ids: Collection[str],
+) -> Mapping[str, Sequence[str]]:
+    """Returns a map from input method name to group IDs.
+
+    Args:
+        raw: Values of --m17n-group-set, or None for one set per group.
+        group_ids: All group IDs.
+    """
+    if raw is None:
+        return {_m17n_name(group_id): (group_id,) for group_id in group_ids}
+    group_sets = dict[str, Sequence[str]]()
+    for group_set in raw:
+        group_set_name, equals, group_set_ids = group_set.partition("=")
+        if not equals or not group_set_name or not group_set_ids:
+            raise ValueError(
+                f"--m17n-group-set is not of the form NAME=GROUP,...: "
+                f"{group_set!r}"
+            )
+        group_set_ids_list = group_set_ids.split(",")
+        if unknown := set(group_set_ids_list) - set(group_ids):
+            raise ValueError(
+                f"--m17n-group-set {group_set!r} has unknown groups: "
+                f"{sorted(unknown)}"
+            )
+        group_sets[_m17n_name(group_set_name)] = group_set_ids_list
+    return group_sets
+
+
+def _render_m17n_group_set(
+    name: str,
+    groups: Sequence[str],
+    group_maps: Mapping[str, Mapping[str, str]],
+) -> str:
+    return input_method.render_m17n(
+        map_=input_method.merge_group_maps(group_maps),
+        name=name,
+        groups=groups,
+    )
+
+
+def _render_m17n_groups(
+    group_maps: Mapping[str, Mapping[str, str]],
+    *,
+    group_sets: Mapping[str, Sequence[str]],
+) -> Mapping[str, str]:
+    """Returns a map from input method name to m17n input method.
+
+    Args:
+        group_maps: Return value of input_method.generate_group_maps().
+        group_sets: Map from input method name to the group IDs to include.
+    """
+    args = (
+        group_sets.keys(),
+        group_sets.values(),
         (
-            resources.files("unimnim")
-            .joinpath("templates/m17n.mim.jinja")
-            .read_text()
+            {group_id: group_maps[group_id] for group_id in group_ids}
+            for group_ids in group_sets.values()
         ),
-        map=map_,
-        prefix_map=prefix_map,
-        version=metadata.version(typing.cast(str, __spec__.parent)),
     )
-    if parsed_args.write_all is not None:
-        (parsed_args.write_all / "unimnim.mim").write_text(m17n_mim)
-    if parsed_args.write_m17n is not None:
-        parsed_args.write_m17n.write_text(m17n_mim)
+    with contextlib.ExitStack() as stack:
+        if len(os.sched_getaffinity(0)) > 1 and len(group_sets) > 1:
+            executor = stack.enter_context(
+                concurrent.futures.ProcessPoolExecutor(
+                    # The default of fork can deadlock if other threads are
+                    # running.
+                    mp_context=multiprocessing.get_context("forkserver"),
+                )
+            )
+            mims = list(executor.map(_render_m17n_group_set, *args))
+        else:
+            mims = list(map(_render_m17n_group_set, *args))
+    return dict(zip(group_sets.keys(), mims, strict=True))
 
-    if parsed_args.write_all is not None:
-        (parsed_args.write_all / "examples.html").write_text(
-            input_method.render_template(
-                (
-                    resources.files("unimnim")
-                    .joinpath("templates/examples.html.jinja")
-                    .read_text()
-                ),
-                data=data_,
+
+def _data_signature(data_path: pathlib.Path) -> Any:
+    """Returns something that changes when any data file changes."""
+    return sorted(
+        (str(file), file.stat().st_mtime_ns, file.stat().st_size)
+        for file in data_path.glob("**/*.toml")
+    )
+
+
+class _Watcher:
+    """Regenerates everything when data files change."""
+
+    def __init__(
+        self,
+        parsed_args: argparse.Namespace,
+        *,
+        data_path: pathlib.Path,
+    ) -> None:
+        self._parsed_args = parsed_args
+        self._data_path = data_path
+        self._signature: Any = None
+        self._previous: _Build | None = None
+
+    def poll(self) -> str | None:
+        """Regenerates if anything changed, and returns a line to print."""
+        signature = _data_signature(self._data_path)
+        if signature == self._signature:
+            return None
+        self._signature = signature
+        start = time.perf_counter()
+        try:
+            with _OutputWriter(skip_unchanged=True) as writer:
+                build = _generate_stages(
+                    self._parsed_args,
+                    data_path=self._data_path,
+                    writer=writer,
+                    previous=self._previous,
+                )
+        except Exception:
+            traceback.print_exc()
+            return f"Failed after {time.perf_counter() - start:.3f} s."
+        if self._previous is None:
+            changed_groups = len(build.groups)
+        else:
+            changed_groups = sum(
+                1
+                for group_id, group in build.groups.items()
+                if self._previous.groups.get(group_id) != group
             )
+        self._previous = build
+        return (
+            f"Rebuilt in {time.perf_counter() - start:.3f} s: re-evaluated "
+            f"{changed_groups} of {len(build.groups)} groups, wrote "
+            f"{len(writer.written)} of "
+            f"{len(writer.written) + len(writer.unchanged)} files."
         )
 
-    if parsed_args.write_all is not None:
-        _write_json(
-            parsed_args.write_all / "coverage.json",
-            coverage.report(covered=frozenset(map_.values())),
+
+def _watch(parsed_args: argparse.Namespace) -> None:
+    with resources.as_file(
+        resources.files("unimnim").joinpath("data")
+    ) as data_path:
+        watcher = _Watcher(parsed_args, data_path=data_path)
+        while True:
+            if (line := watcher.poll()) is not None:
+                print(line, flush=True)
+            time.sleep(parsed_args.interval)
+
+
+def _serve(parsed_args: argparse.Namespace) -> None:
+    # asyncio is slow to import, and only this subcommand needs it.
+    import asyncio
+
+    from unimnim import serve
+
+    asyncio.run(
+        serve.serve(
+            socket_path=parsed_args.socket,
+            output_dir=parsed_args.output_dir,
+            reload_interval=parsed_args.reload_interval,
+        )
+    )
+
+
+_KNOWN_SEQUENCES_TOML_CHUNK_SIZE = 10_000
+
+_KNOWN_SEQUENCES_TOML_HEADER = textwrap.dedent("""\
+    # This file is intended to help with starting a new data file.
+    # Note that there might be syntax errors, combining characters
+    # aren't represented with `[combining]`, and it might need other
+    # manual changes.
+""")
+
+
+def _known_sequences_toml_chunk(sequences: Sequence[str]) -> str:
+    return "".join(
+        f'"" = "{data.to_explicit_string(sequence)}"\n'
+        for sequence in sequences
+    )
+
+
+def _write_known_sequences(
+    writer: _OutputWriter,
+    output_dir: pathlib.Path,
+    *,
+    scripts: frozenset[str] | None = None,
+) -> None:
+    writer.write_json(
+        output_dir / "known_sequences.json",
+        input_method.known_sequences(scripts),
+    )
+    chunks = itertools.batched(
+        sorted(input_method.known_sequences(scripts)),
+        _KNOWN_SEQUENCES_TOML_CHUNK_SIZE,
+    )
+    with contextlib.ExitStack() as stack:
+        if len(os.sched_getaffinity(0)) > 1:
+            executor = stack.enter_context(
+                concurrent.futures.ProcessPoolExecutor(
+                    # The default of fork can deadlock if other threads are
+                    # running.
+                    mp_context=multiprocessing.get_context("forkserver"),
+                )
+            )
+            chunks_text = executor.map(_known_sequences_toml_chunk, chunks)
+        else:
+            chunks_text = map(_known_sequences_toml_chunk, chunks)
+        writer.write_text(
+            output_dir / "known_sequences.toml",
+            "".join(
+                (
+                    _KNOWN_SEQUENCES_TOML_HEADER,
+                    *chunks_text,
+                )
+            ),
         )
 
 
@@ -2,13 +2,20 @@
 #
 # SPDX-License-Identifier: Apache-2.0
 
+import argparse
 from collections.abc import Sequence, Set
 import contextlib
+import json
+import os
 import pathlib
+import shutil
+import subprocess
+import sys
 
 import pytest
 
 from unimnim import main
+from unimnim import profiling
 
 
 @pytest.mark.parametrize(
@@ -22,13 +29,25 @@ from unimnim import main
                 "output/known_sequences.json",
                 "output/known_sequences.toml",
                 "output/map.json",
+                "output/prefix_collisions.json",
+                "output/lookup.bin",
+                "output/reverse_map.json",
+                "output/name_index.json",
+                "output/serve_manifest.json",
                 "output/prefix_map.json",
                 "output/unimnim.mim",
                 "output/examples.html",
                 "output/coverage.json",
+                "output/coverage_by_group.json",
             },
         ),
         (("--write-m17n=unimnim.mim",), {"unimnim.mim"}),
+        (
+            ("--timings=timings",),
+            {"timings", "timings/timings.json", "timings/trace.json"},
+        ),
+        (("--counters=counters.json",), {"counters.json"}),
+        (("--memory-profile=memory.json",), {"memory.json"}),
     ),
 )
 def test_main(
@@ -44,6 +63,294 @@ def test_main(
     } == expected_files
 
 
+def test_main_timings(tmp_path: pathlib.Path) -> None:
+    main.main(args=(f"--timings={tmp_path}",))
+
+    summary = json.loads((tmp_path / "timings.json").read_text())
+    paths = {tuple(span["path"]) for span in summary["spans"]}
+    assert ("main", "load_data") in paths
+    assert ("main", "generate_map", "Latn") in paths
+    assert ("main", "generate_map", "Latn", "main") in paths
+    trace = json.loads((tmp_path / "trace.json").read_text())
+    assert {event["ph"] for event in trace["traceEvents"]} == {"X"}
+
+
+def test_query(
+    tmp_path: pathlib.Path,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    main.main(args=(f"--write-all={tmp_path}",))
+    capsys.readouterr()
+
+    main.main(args=("query", f"--lookup={tmp_path}/lookup.bin", "La'"))
+    assert capsys.readouterr().out == "\N{LATIN SMALL LETTER A WITH ACUTE}\n"
+
+    main.main(
+        args=("query", f"--lookup={tmp_path}/lookup.bin", "--prefix", "La'")
+    )
+    lines = capsys.readouterr().out.splitlines()
+    assert "La'\t\N{LATIN SMALL LETTER A WITH ACUTE}" in lines
+    assert all(line.startswith("La'") for line in lines)
+
+    with pytest.raises(SystemExit, match="No such mnemonic"):
+        main.main(args=("query", f"--lookup={tmp_path}/lookup.bin", "La'!!"))
+
+
+def test_search(
+    tmp_path: pathlib.Path,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    main.main(args=(f"--write-all={tmp_path}",))
+    capsys.readouterr()
+
+    main.main(
+        args=("search", f"--output-dir={tmp_path}", "latin", "small a acute")
+    )
+
+    assert (
+        "\N{LATIN SMALL LETTER A WITH ACUTE}\tLa'"
+        in capsys.readouterr().out.splitlines()
+    )
+
+    main.main(args=("search", f"--output-dir={tmp_path}", "null"))
+
+    assert "\N{NULL}\tZNUL" in capsys.readouterr().out.splitlines()
+
+
+def test_output_writer(tmp_path: pathlib.Path) -> None:
+    with main._OutputWriter() as writer:
+        writer.write_bytes(tmp_path / "a", b"a")
+        writer.write_text(tmp_path / "b", "b")
+        writer.write_json(tmp_path / "c", {"c": 1})
+
+    assert (tmp_path / "a").read_bytes() == b"a"
+    assert (tmp_path / "b").read_text() == "b"
+    assert json.loads((tmp_path / "c").read_text()) == {"c": 1}
+    assert sorted(writer.written) == [
+        tmp_path / "a",
+        tmp_path / "b",
+        tmp_path / "c",
+    ]
+    assert set(tmp_path.iterdir()) == set(writer.written)
+
+
+def test_output_writer_errors(tmp_path: pathlib.Path) -> None:
+    with pytest.raises(ExceptionGroup) as exc_info:
+        with main._OutputWriter() as writer:
+            writer.write_text(tmp_path / "missing" / "a", "a")
+            writer.write_text(tmp_path / "b", "b")
+
+    assert len(exc_info.value.exceptions) == 1
+    assert isinstance(exc_info.value.exceptions[0], FileNotFoundError)
+    assert exc_info.value.exceptions[0].__notes__ == [
+        f"While writing {tmp_path / 'missing' / 'a'}"
+    ]
+    assert (tmp_path / "b").read_text() == "b"
+
+
+def test_output_writer_removes_temporary_file_on_error(
+    tmp_path: pathlib.Path,
+) -> None:
+    (tmp_path / "a").mkdir()
+    (tmp_path / "a" / "b").touch()
+
+    with pytest.raises(ExceptionGroup):
+        with main._OutputWriter() as writer:
+            writer.write_text(tmp_path / "a", "a")
+
+    assert set(tmp_path.iterdir()) == {tmp_path / "a"}
+
+
+def test_output_writer_timings(tmp_path: pathlib.Path) -> None:
+    timings = profiling.Timings()
+
+    with main._OutputWriter(timings=timings) as writer:
+        writer.write_text(tmp_path / "a", "a")
+
+    assert [(r.path, r.category) for r in timings.records] == [
+        (("a",), "write")
+    ]
+
+
+def test_output_writer_last(tmp_path: pathlib.Path) -> None:
+    with main._OutputWriter() as writer:
+        writer.write_json_last(
+            tmp_path / "last", lambda: (tmp_path / "a").read_text()
+        )
+        writer.write_text(tmp_path / "a", "a")
+
+    assert json.loads((tmp_path / "last").read_text()) == "a"
+
+
+def test_output_writer_last_skipped_on_error(tmp_path: pathlib.Path) -> None:
+    with pytest.raises(ExceptionGroup):
+        with main._OutputWriter() as writer:
+            writer.write_json_last(tmp_path / "last", lambda: "last")
+            writer.write_text(tmp_path / "missing" / "a", "a")
+
+    assert not (tmp_path / "last").exists()
+
+
+def test_write_known_sequences_parallel(
+    tmp_path: pathlib.Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    (tmp_path / "serial").mkdir()
+    (tmp_path / "parallel").mkdir()
+    monkeypatch.setattr(os, "sched_getaffinity", lambda pid: {0})
+    with main._OutputWriter() as writer:
+        main._write_known_sequences(writer, tmp_path / "serial")
+    monkeypatch.setattr(os, "sched_getaffinity", lambda pid: {0, 1})
+    with main._OutputWriter() as writer:
+        main._write_known_sequences(writer, tmp_path / "parallel")
+
+    assert (tmp_path / "parallel" / "known_sequences.toml").read_text() == (
+        tmp_path / "serial" / "known_sequences.toml"
+    ).read_text()
+
+
+@pytest.mark.parametrize("cpus", ({0}, {0, 1}))
+def test_write_m17n_groups(
+    cpus: Set[int],
+    tmp_path: pathlib.Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(os, "sched_getaffinity", lambda pid: cpus)
+
+    main.main(
+        args=(
+            f"--write-m17n={tmp_path / 'unimnim.mim'}",
+            f"--write-m17n-groups={tmp_path / 'groups'}",
+            "--m17n-group-set=Latin+Greek=Latn,Grek",
+            "--m17n-group-set=math=common/math",
+        )
+    )
+
+    assert {f.name for f in (tmp_path / "groups").iterdir()} == {
+        "unimnim-latin-greek.mim",
+        "unimnim-math.mim",
+    }
+    latin_greek = (tmp_path / "groups" / "unimnim-latin-greek.mim").read_text()
+    assert "(input-method t unimnim-latin-greek)" in latin_greek
+    assert "(Latn, Grek)" in latin_greek
+    assert len(latin_greek) < len((tmp_path / "unimnim.mim").read_text())
+
+
+def test_write_m17n_groups_default(tmp_path: pathlib.Path) -> None:
+    main.main(args=(f"--write-m17n-groups={tmp_path}",))
+
+    assert {"unimnim-latn.mim", "unimnim-common-math.mim"} <= {
+        f.name for f in tmp_path.iterdir()
+    }
+
+
+@pytest.mark.parametrize(
+    "group_set,error_regex",
+    (
+        ("Latn", "not of the form"),
+        ("=Latn", "not of the form"),
+        ("latin=", "not of the form"),
+        ("latin=Latn,NotAGroup", "unknown groups: \\['NotAGroup'\\]"),
+    ),
+)
+def test_write_m17n_groups_error(
+    group_set: str,
+    error_regex: str,
+    tmp_path: pathlib.Path,
+) -> None:
+    with pytest.raises(ValueError, match=error_regex):
+        main.main(
+            args=(
+                f"--write-m17n-groups={tmp_path}",
+                f"--m17n-group-set={group_set}",
+            )
+        )
+
+
+@pytest.mark.parametrize(
+    "groups,prefixes,language",
+    (
+        (("Latn", "Grek"), ("L", "gr"), "el"),
+        # The likely script of Japanese is Jpan, not Hrkt.
+        (("Hrkt",), ("K",), "ja"),
+    ),
+)
+def test_groups(
+    groups: Sequence[str],
+    prefixes: tuple[str, ...],
+    language: str,
+    tmp_path: pathlib.Path,
+) -> None:
+    main.main(args=(f"--write-all={tmp_path / 'all'}",))
+    main.main(
+        args=(
+            f"--write-all={tmp_path / 'subset'}",
+            f"--groups={','.join(groups)}",
+        )
+    )
+    all_map = json.loads((tmp_path / "all" / "map.json").read_text())
+    subset_map = json.loads((tmp_path / "subset" / "map.json").read_text())
+    subset_coverage = json.loads(
+        (tmp_path / "subset" / "coverage.json").read_text()
+    )
+    subset_coverage_by_group = json.loads(
+        (tmp_path / "subset" / "coverage_by_group.json").read_text()
+    )
+
+    assert list(subset_map.items()) == [
+        (mnemonic, result)
+        for mnemonic, result in all_map.items()
+        if mnemonic.startswith(prefixes)
+    ]
+    assert language in subset_coverage["language"]
+    assert subset_coverage_by_group["group"].keys() == set(groups)
+
+
+def test_watcher(tmp_path: pathlib.Path) -> None:
+    assert __spec__.origin is not None
+    data_path = tmp_path / "data"
+    shutil.copytree(pathlib.Path(__spec__.origin).parent / "data", data_path)
+    output_path = tmp_path / "output"
+    watcher = main._Watcher(
+        argparse.Namespace(
+            write_all=output_path,
+            write_m17n=None,
+            groups=None,
+            write_m17n_groups=None,
+            m17n_group_set=None,
+            cache_dir=None,
+            revalidate=False,
+        ),
+        data_path=data_path,
+    )
+    group_count = len(list(data_path.glob("**/*.toml")))
+
+    first = watcher.poll()
+    unchanged = watcher.poll()
+    with (data_path / "Latn.toml").open("a") as f:
+        f.write("# Comment that doesn't change the group.\n")
+    comment_changed = watcher.poll()
+    (data_path / "Test.toml").write_text("""
+        prefix = "test"
+        [maps.main]
+        "a" = "U+0061 LATIN SMALL LETTER A"
+        [expressions]
+        main = ["map", "main"]
+    """)
+    group_added = watcher.poll()
+
+    assert first is not None
+    assert f"re-evaluated {group_count} of {group_count} groups" in first
+    assert unchanged is None
+    assert comment_changed is not None
+    assert f"re-evaluated 0 of {group_count} groups, wrote 0 of" in (
+        comment_changed
+    )
+    assert group_added is not None
+    assert f"re-evaluated 1 of {group_count + 1} groups" in group_added
+    assert "testa" in json.loads((output_path / "map.json").read_text())
+
+
 def test_readme(tmp_path: pathlib.Path) -> None:
     main.main(args=(f"--write-all={tmp_path}",))
     examples_html = (tmp_path / "examples.html").read_text()
@@ -65,3 +372,37 @@ def test_readme(tmp_path: pathlib.Path) -> None:
     )
 
     assert readme_examples == examples_html
+
+
+@pytest.mark.parametrize(
+    "module",
+    (
+        "unimnim",
+        "unimnim.coverage",
+        "unimnim.data",
+        "unimnim.input_method",
+        "unimnim.lookup",
+        "unimnim.main",
+        "unimnim.name_index",
+    ),
+)
+def test_import_is_lightweight(module: str) -> None:
+    # This needs a fresh interpreter, since other tests import everything.
+    result = subprocess.run(
+        (
+            sys.executable,
+            "-c",
+            f"import sys, {module}; print(' '.join(sorted(sys.modules)))",
+        ),
+        stdout=subprocess.PIPE,
+        check=True,
+        text=True,
+    )
+
+    assert not {
+        "asyncio",
+        "icu",
+        "jinja2",
+        "importlib.metadata",
+        "unimnim.api",
+    } & set(result.stdout.split())
@@ -0,0 +1,132 @@
+# SPDX-FileCopyrightText: 2025 David Mandelberg <david@mandelberg.org>
+#
+# SPDX-License-Identifier: Apache-2.0
+"""Index of results by the words in their Unicode names."""
+
+import array
+import bisect
+from collections.abc import Collection, Iterable, Mapping, Sequence
+import dataclasses
+import re
+from typing import Any, Self
+import unicodedata
+
+_TOKEN_REGEX = re.compile(r"[A-Z0-9]+")
+
+
+def _tokens(text: str, /) -> Iterable[str]:
+    return _TOKEN_REGEX.findall(text.upper())
+
+
+def _result_tokens(
+    result: str,
+    /,
+    *,
+    aliases: Mapping[str, Collection[str]],
+) -> set[str]:
+    import icu
+
+    tokens = set[str]()
+    for code_point in result:
+        tokens.update(_tokens(unicodedata.name(code_point, "")))
+        tokens.update(
+            _tokens(
+                icu.Char.charName(
+                    code_point, icu.UCharNameChoice.CHAR_NAME_ALIAS
+                )
+            )
+        )
+        for alias in aliases.get(code_point, ()):
+            tokens.update(_tokens(alias))
+    return tokens
+
+
+@dataclasses.dataclass(frozen=True)
+class NameIndex:
+    """Inverted index from name token to results.
+
+    Attributes:
+        results: All results, sorted. Results are identified by their index in
+            this sequence.
+        postings: Map from token, e.g., "ACUTE", to a sorted array of indexes of
+            results with that token in the name or alias of any of their code
+            points.
+    """
+
+    results: Sequence[str]
+    postings: Mapping[str, array.array[int]]
+
+    @classmethod
+    def build(
+        cls,
+        results: Iterable[str],
+        /,
+        *,
+        aliases: Mapping[str, Collection[str]] | None = None,
+    ) -> Self:
+        """Returns the index for the given results.
+
+        Args:
+            results: Results to index.
+            aliases: Map from code point to aliases to index in addition to
+                its name and corrected name, e.g., from data.aliases(). ICU
+                doesn't have the other types of aliases, such as the names of
+                control characters.
+        """
+        sorted_results = sorted(frozenset(results))
+        postings = dict[str, array.array[int]]()
+        for result_id, result in enumerate(sorted_results):
+            for token in _result_tokens(result, aliases=aliases or {}):
+                postings.setdefault(token, array.array("I")).append(result_id)
+        return cls(sorted_results, postings)
+
+    def to_json(self) -> Any:
+        """Returns the index as a JSON-encodable object."""
+        return {
+            "results": list(self.results),
+            "postings": {
+                token: posting.tolist()
+                for token, posting in sorted(self.postings.items())
+            },
+        }
+
+    @classmethod
+    def from_json(cls, raw: Any, /) -> Self:
+        """Returns the index from the output of to_json()."""
+        return cls(
+            raw["results"],
+            {
+                token: array.array("I", posting)
+                for token, posting in raw["postings"].items()
+            },
+        )
+
+    def search(self, query: str, /) -> Sequence[str]:
+        """Returns results with all words in query in their names.
+
+        Args:
+            query: Words to search for, e.g., "small a acute". Case and
+                punctuation are ignored.
+        """
+        tokens = frozenset(_tokens(query))
+        if not tokens:
+            return ()
+        try:
+            postings = sorted(
+                (self.postings[token] for token in tokens), key=len
+            )
+        except KeyError:
+            return ()
+        result_ids: Iterable[int] = postings[0]
+        for posting in postings[1:]:
+            result_ids = [
+                result_id
+                for result_id in result_ids
+                if _contains(posting, result_id)
+            ]
+        return [self.results[result_id] for result_id in result_ids]
+
+
+def _contains(posting: array.array[int], result_id: int) -> bool:
+    index = bisect.bisect_left(posting, result_id)
+    return index < len(posting) and posting[index] == result_id
@@ -0,0 +1,61 @@
+# SPDX-FileCopyrightText: 2025 David Mandelberg <david@mandelberg.org>
+#
+# SPDX-License-Identifier: Apache-2.0
+
+from collections.abc import Sequence
+import json
+
+import pytest
+
+from unimnim import name_index
+
+_RESULTS = (
+    "a",
+    "\N{LATIN SMALL LETTER A WITH ACUTE}",
+    "\N{LATIN CAPITAL LETTER A WITH ACUTE}",
+    "\N{HYPHEN-MINUS}",
+    "\N{LATIN CAPITAL LETTER OI}",
+    "e\N{COMBINING ACUTE ACCENT}\N{COMBINING DOT BELOW}",
+    "\N{NULL}",
+    "\N{CHARACTER TABULATION}",
+)
+_ALIASES = {
+    "\N{NULL}": ("NULL",),
+    "\N{CHARACTER TABULATION}": ("HORIZONTAL TABULATION",),
+}
+
+
+@pytest.mark.parametrize(
+    "query,expected",
+    (
+        ("", ()),
+        ("not-a-word", ()),
+        ("acute", sorted(_RESULTS[1:3] + _RESULTS[5:6])),
+        ("small a acute", ("\N{LATIN SMALL LETTER A WITH ACUTE}",)),
+        ("Small A  ACUTE!", ("\N{LATIN SMALL LETTER A WITH ACUTE}",)),
+        ("small acute", sorted((_RESULTS[1], _RESULTS[5]))),
+        ("minus", ("\N{HYPHEN-MINUS}",)),
+        ("hyphen-minus", ("\N{HYPHEN-MINUS}",)),
+        # Alias.
+        ("gha", ("\N{LATIN CAPITAL LETTER OI}",)),
+        # Different code points in the same result.
+        ("e acute below", (_RESULTS[5],)),
+        # Control characters, which only have aliases from the data.
+        ("null", ("\N{NULL}",)),
+        ("horizontal tabulation", ("\N{CHARACTER TABULATION}",)),
+    ),
+)
+def test_search(query: str, expected: Sequence[str]) -> None:
+    index = name_index.NameIndex.build(_RESULTS, aliases=_ALIASES)
+
+    assert tuple(index.search(query)) == tuple(expected)
+
+
+def test_json_round_trip() -> None:
+    index = name_index.NameIndex.build(_RESULTS, aliases=_ALIASES)
+
+    round_tripped = name_index.NameIndex.from_json(
+        json.loads(json.dumps(index.to_json()))
+    )
+
+    assert round_tripped == index
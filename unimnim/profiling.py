@@ -0,0 +1,265 @@
+# SPDX-FileCopyrightText: 2025 David Mandelberg <david@mandelberg.org>
+#
+# SPDX-License-Identifier: Apache-2.0
+"""Tools to profile generating the input method.
+
+These are designed to help find what's slow or expensive, not to be used in
+normal operation, so the main code accepts None wherever one of these is used.
+"""
+
+import collections
+from collections.abc import Iterator, Sequence
+import contextlib
+import dataclasses
+import os
+import resource
+import threading
+import time
+import tracemalloc
+from typing import Any
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class TimingRecord:
+    """Timing of one span.
+
+    Attributes:
+        path: Names of the span's ancestors and the span itself, outermost
+            first.
+        category: Kind of span, e.g., "stage" or "group".
+        thread_id: Native ID of the thread the span ran in.
+        start_ns: Wall clock start time, relative to when the Timings object
+            was created.
+        wall_ns: Wall clock duration.
+        cpu_ns: CPU time used by the thread during the span.
+    """
+
+    path: Sequence[str]
+    category: str
+    thread_id: int
+    start_ns: int
+    wall_ns: int
+    cpu_ns: int
+
+
+class Timings:
+    """Collects wall and CPU time of nested spans."""
+
+    def __init__(self) -> None:
+        self._origin_ns = time.perf_counter_ns()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._records = list[TimingRecord]()
+
+    @property
+    def records(self) -> Sequence[TimingRecord]:
+        """Records of finished spans, sorted by start time."""
+        with self._lock:
+            return sorted(self._records, key=lambda record: record.start_ns)
+
+    @contextlib.contextmanager
+    def span(self, name: str, *, category: str) -> Iterator[None]:
+        """Times the body of the with statement.
+
+        Args:
+            name: Name of the span.
+            category: Kind of span.
+        """
+        stack: list[str] = self._local.__dict__.setdefault("stack", [])
+        stack.append(name)
+        path = tuple(stack)
+        start_ns = time.perf_counter_ns()
+        start_cpu_ns = time.thread_time_ns()
+        try:
+            yield
+        finally:
+            cpu_ns = time.thread_time_ns() - start_cpu_ns
+            wall_ns = time.perf_counter_ns() - start_ns
+            stack.pop()
+            with self._lock:
+                self._records.append(
+                    TimingRecord(
+                        path=path,
+                        category=category,
+                        thread_id=threading.get_native_id(),
+                        start_ns=start_ns - self._origin_ns,
+                        wall_ns=wall_ns,
+                        cpu_ns=cpu_ns,
+                    )
+                )
+
+    def summary(self) -> Any:
+        """Returns a summary as a JSON-encodable object."""
+        return {
+            "spans": [
+                dict(
+                    path=list(record.path),
+                    category=record.category,
+                    wall_seconds=record.wall_ns / 1e9,
+                    cpu_seconds=record.cpu_ns / 1e9,
+                )
+                for record in self.records
+            ],
+        }
+
+    def trace_events(self) -> Any:
+        """Returns Chrome trace events as a JSON-encodable object.
+
+        See
+        https://docs.google.com/document/d/1CvAClvFfyA5R-PhYUmn5OOQtYMH4h6I0nSsKchNAySU
+        for the format.
+        """
+        pid = os.getpid()
+        return {
+            "displayTimeUnit": "ms",
+            "traceEvents": [
+                {
+                    "name": record.path[-1],
+                    "cat": record.category,
+                    "ph": "X",
+                    "ts": record.start_ns / 1e3,
+                    "dur": record.wall_ns / 1e3,
+                    "pid": pid,
+                    "tid": record.thread_id,
+                    "args": {
+                        "path": "/".join(record.path),
+                        "cpu_ms": record.cpu_ns / 1e6,
+                    },
+                }
+                for record in self.records
+            ],
+        }
+
+
+def span(
+    timings: Timings | None, name: str, *, category: str
+) -> contextlib.AbstractContextManager[None]:
+    """Returns Timings.span(...), or a no-op if timings is None."""
+    if timings is None:
+        return contextlib.nullcontext()
+    return timings.span(name, category=category)
+
+
+class Counters:
+    """Counts work done by each expression node."""
+
+    def __init__(self) -> None:
+        self._by_node = dict[tuple[str, str], collections.Counter[str]]()
+
+    def node(self, *, group_id: str, path: str) -> collections.Counter[str]:
+        """Returns the counters for an expression node.
+
+        Args:
+            group_id: Group the expression is in.
+            path: Where the expression is in the group, e.g.,
+                "expressions.main[1]".
+        """
+        return self._by_node.setdefault((group_id, path), collections.Counter())
+
+    def sum(self, name: str) -> int:
+        """Returns the sum of one counter over all expression nodes."""
+        return sum(counters[name] for counters in self._by_node.values())
+
+    def report(self, *, limit: int | None = None) -> Any:
+        """Returns a report as a JSON-encodable object.
+
+        Args:
+            limit: How many nodes to include, or None for all of them. Nodes
+                with the largest sum of all their counters are first.
+        """
+        nodes = sorted(
+            self._by_node.items(),
+            key=lambda item: (-item[1].total(), item[0]),
+        )
+        return [
+            dict(
+                file=f"{group_id}.toml",
+                expression=path,
+                total=counters.total(),
+                counters=dict(sorted(counters.items())),
+            )
+            for (group_id, path), counters in nodes[:limit]
+        ]
+
+
+def _current_rss_bytes() -> int | None:
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return None
+
+
+class MemoryProfile:
+    """Records memory use after each stage, using tracemalloc.
+
+    This starts tracing when it's created, and tracing should be stopped with
+    stop() when done.
+    """
+
+    def __init__(self, *, top_allocations: int = 10) -> None:
+        """Initializer.
+
+        Args:
+            top_allocations: How many of the largest allocation sites to record
+                for each stage.
+        """
+        self._top_allocations = top_allocations
+        self._stages = list[Any]()
+        tracemalloc.start()
+
+    def stop(self) -> None:
+        """Stops tracing."""
+        tracemalloc.stop()
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Records memory use of the body of the with statement.
+
+        Args:
+            name: Name of the stage.
+        """
+        tracemalloc.reset_peak()
+        try:
+            yield
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot().filter_traces(
+                (tracemalloc.Filter(False, tracemalloc.__file__),)
+            )
+            self._stages.append(
+                dict(
+                    stage=name,
+                    traced_current_bytes=current,
+                    traced_peak_bytes=peak,
+                    rss_bytes=_current_rss_bytes(),
+                    max_rss_bytes=(
+                        # ru_maxrss is in KiB on Linux.
+                        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+                        * 1024
+                    ),
+                    top_allocations=[
+                        dict(
+                            location=str(statistic.traceback),
+                            size_bytes=statistic.size,
+                            count=statistic.count,
+                        )
+                        for statistic in snapshot.statistics("lineno")[
+                            : self._top_allocations
+                        ]
+                    ],
+                )
+            )
+
+    def report(self) -> Any:
+        """Returns a report as a JSON-encodable object."""
+        return {"stages": list(self._stages)}
+
+
+def memory_stage(
+    memory_profile: MemoryProfile | None, name: str
+) -> contextlib.AbstractContextManager[None]:
+    """Returns MemoryProfile.stage(...), or a no-op without a profile."""
+    if memory_profile is None:
+        return contextlib.nullcontext()
+    return memory_profile.stage(name)
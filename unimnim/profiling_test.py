@@ -0,0 +1,101 @@
+# SPDX-FileCopyrightText: 2025 David Mandelberg <david@mandelberg.org>
+#
+# SPDX-License-Identifier: Apache-2.0
+
+from unimnim import profiling
+
+
+def test_timings() -> None:
+    timings = profiling.Timings()
+
+    with timings.span("outer", category="stage"):
+        with timings.span("inner", category="group"):
+            pass
+
+    assert [(record.path, record.category) for record in timings.records] == [
+        (("outer",), "stage"),
+        (("outer", "inner"), "group"),
+    ]
+    outer, inner = timings.records
+    assert outer.start_ns <= inner.start_ns
+    assert outer.wall_ns >= inner.wall_ns
+    assert [span["path"] for span in timings.summary()["spans"]] == [
+        ["outer"],
+        ["outer", "inner"],
+    ]
+    assert [
+        (event["name"], event["cat"], event["args"]["path"])
+        for event in timings.trace_events()["traceEvents"]
+    ] == [
+        ("outer", "stage", "outer"),
+        ("inner", "group", "outer/inner"),
+    ]
+
+
+def test_timings_records_exceptions() -> None:
+    timings = profiling.Timings()
+
+    try:
+        with timings.span("failing", category="stage"):
+            raise ValueError()
+    except ValueError:
+        pass
+    with timings.span("after", category="stage"):
+        pass
+
+    assert [record.path for record in timings.records] == [
+        ("failing",),
+        ("after",),
+    ]
+
+
+def test_span_none() -> None:
+    with profiling.span(None, "ignored", category="stage"):
+        pass
+
+
+def test_counters() -> None:
+    counters = profiling.Counters()
+
+    counters.node(group_id="latin", path="expressions.main")["a"] += 1
+    counters.node(group_id="latin", path="expressions.main[1]")["a"] += 5
+    counters.node(group_id="latin", path="expressions.main[1]")["b"] += 1
+    counters.node(group_id="greek", path="expressions.main")["a"] += 2
+
+    assert counters.report(limit=2) == [
+        dict(
+            file="latin.toml",
+            expression="expressions.main[1]",
+            total=6,
+            counters=dict(a=5, b=1),
+        ),
+        dict(
+            file="greek.toml",
+            expression="expressions.main",
+            total=2,
+            counters=dict(a=2),
+        ),
+    ]
+
+
+def test_memory_profile() -> None:
+    memory_profile = profiling.MemoryProfile(top_allocations=1)
+    try:
+        with memory_profile.stage("allocate"):
+            allocated = [object() for _ in range(10000)]
+        del allocated
+        with memory_profile.stage("nothing"):
+            pass
+    finally:
+        memory_profile.stop()
+
+    allocate, nothing = memory_profile.report()["stages"]
+    assert allocate["stage"] == "allocate"
+    assert allocate["traced_peak_bytes"] >= 10000 * 16
+    assert len(allocate["top_allocations"]) == 1
+    assert nothing["traced_peak_bytes"] < allocate["traced_peak_bytes"]
+
+
+def test_memory_stage_none() -> None:
+    with profiling.memory_stage(None, "ignored"):
+        pass
@@ -0,0 +1,232 @@
+# SPDX-FileCopyrightText: 2025 David Mandelberg <david@mandelberg.org>
+#
+# SPDX-License-Identifier: Apache-2.0
+"""Engine for typing mnemonics from Python.
+
+This has the same behavior as the m17n input method in
+templates/m17n.mim.jinja, so that the mnemonics can be used without m17n.
+"""
+
+from collections.abc import Mapping, Sequence
+import dataclasses
+import enum
+from typing import Self
+
+from unimnim import input_method
+
+ROOT = 0
+"""Index of the root node of every Trie."""
+
+START_KEY = "A-\\"
+BACKSPACE_KEY = "BackSpace"
+
+_MAX_CANDIDATES = 1000
+
+
+@dataclasses.dataclass(frozen=True)
+class Trie:
+    """Immutable trie of mnemonics.
+
+    Nodes are identified by index, with ROOT as the root. Each node corresponds
+    to a prefix of at least one mnemonic.
+    """
+
+    _children: Sequence[Mapping[str, int]]
+    _parents: Sequence[int]
+    _prefixes: Sequence[str]
+    _results: Sequence[str | None]
+    _candidates: Sequence[Sequence[str]]
+
+    @classmethod
+    def build(
+        cls,
+        map_: Mapping[str, str],
+        *,
+        prefix_map: Mapping[str, Sequence[str]] | None = None,
+    ) -> Self:
+        """Returns a trie.
+
+        Args:
+            map_: Map from mnemonic to result, from input_method.generate_map.
+            prefix_map: Prefix map, from input_method.generate_prefix_map. If
+                None, it's generated from map_.
+        """
+        if prefix_map is None:
+            prefix_map = input_method.generate_prefix_map(map_)
+        children = [dict[str, int]()]
+        parents = [ROOT]
+        prefixes = [""]
+        results: list[str | None] = [map_.get("")]
+        for mnemonic, result in map_.items():
+            node = ROOT
+            for key in mnemonic:
+                if (child := children[node].get(key)) is None:
+                    child = len(children)
+                    children[node][key] = child
+                    children.append({})
+                    parents.append(node)
+                    prefixes.append(prefixes[node] + key)
+                    results.append(None)
+                node = child
+            results[node] = result
+        return cls(
+            tuple(children),
+            tuple(parents),
+            tuple(prefixes),
+            tuple(results),
+            tuple(
+                tuple(prefix_map.get(prefix, ())[:_MAX_CANDIDATES])
+                for prefix in prefixes
+            ),
+        )
+
+    def __len__(self) -> int:
+        return len(self._children)
+
+    def step(self, node: int, key: str) -> int | None:
+        """Returns the child of node for key, or None if there isn't one."""
+        return self._children[node].get(key)
+
+    def children(self, node: int) -> Mapping[str, int]:
+        """Returns a map from key to child node."""
+        return self._children[node]
+
+    def parent(self, node: int) -> int:
+        """Returns the parent of node, or ROOT for ROOT."""
+        return self._parents[node]
+
+    def prefix(self, node: int) -> str:
+        """Returns the keys that lead from ROOT to node."""
+        return self._prefixes[node]
+
+    def result(self, node: int) -> str | None:
+        """Returns the result if node is a full mnemonic, or None otherwise."""
+        return self._results[node]
+
+    def candidates(self, node: int) -> Sequence[str]:
+        """Returns results of mnemonics starting with node's prefix."""
+        return self._candidates[node]
+
+
+class _Mode(enum.Enum):
+    INIT = enum.auto()
+    MAP = enum.auto()
+    SEARCH_PREFIX = enum.auto()
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class Output:
+    """Output from handling a key.
+
+    Attributes:
+        commit: Text to commit.
+        forward: Whether the key was not consumed, and should be handled
+            normally after committing the text.
+    """
+
+    commit: str = ""
+    forward: bool = False
+
+
+class Session:
+    """State of typing in one place, e.g., one text field.
+
+    The state is a mode and a node in the trie, so handling a key takes
+    constant time and a trie can be shared by any number of sessions.
+    """
+
+    def __init__(
+        self,
+        trie: Trie,
+        *,
+        prompt: str = "·",
+        search_prefix_prompt: str = "·",
+    ) -> None:
+        """Initializer.
+
+        Args:
+            trie: Mnemonics to use.
+            prompt: What to show before a mnemonic.
+            search_prefix_prompt: What to show before a mnemonic prefix search.
+        """
+        self._trie = trie
+        self._prompt = prompt
+        self._search_prefix_prompt = search_prefix_prompt
+        self._mode = _Mode.INIT
+        self._node = ROOT
+
+    @property
+    def preedit(self) -> str:
+        """Text that's being composed."""
+        match self._mode:
+            case _Mode.INIT:
+                return ""
+            case _Mode.MAP:
+                if (result := self._trie.result(self._node)) is not None:
+                    return result
+                return self._prompt + self._trie.prefix(self._node)
+            case _Mode.SEARCH_PREFIX:
+                if self._node == ROOT:
+                    return self._search_prefix_prompt
+                return self._trie.candidates(self._node)[0]
+
+    @property
+    def candidates(self) -> Sequence[str]:
+        """Candidates to show, if any."""
+        if self._mode is _Mode.SEARCH_PREFIX and self._node != ROOT:
+            return self._trie.candidates(self._node)
+        return ()
+
+    def _pending(self) -> str:
+        """Returns what to commit if the current mnemonic ends now."""
+        match self._mode:
+            case _Mode.INIT:
+                return ""
+            case _Mode.MAP:
+                result = self._trie.result(self._node)
+                return (
+                    self._trie.prefix(self._node) if result is None else result
+                )
+            case _Mode.SEARCH_PREFIX:
+                if self._node == ROOT:
+                    return ""
+                return self._trie.candidates(self._node)[0]
+
+    def _reset(self, mode: _Mode = _Mode.INIT) -> None:
+        self._mode = mode
+        self._node = ROOT
+
+    def feed(self, key: str) -> Output:
+        """Handles a key.
+
+        Args:
+            key: Key, either a character or START_KEY or BACKSPACE_KEY.
+        """
+        match self._mode:
+            case _Mode.INIT:
+                if key == START_KEY:
+                    self._reset(_Mode.MAP)
+                    return Output()
+                return Output(forward=True)
+            case _Mode.MAP:
+                if self._node == ROOT and key == START_KEY:
+                    self._reset(_Mode.SEARCH_PREFIX)
+                    return Output()
+                if (child := self._trie.step(self._node, key)) is not None:
+                    self._node = child
+                    if self._trie.children(child):
+                        return Output()
+                    commit = self._pending()
+                    self._reset()
+                    return Output(commit=commit)
+            case _Mode.SEARCH_PREFIX:
+                if (child := self._trie.step(self._node, key)) is not None:
+                    self._node = child
+                    return Output()
+                if key == BACKSPACE_KEY and self._node != ROOT:
+                    self._node = self._trie.parent(self._node)
+                    return Output()
+        commit = self._pending()
+        self._reset()
+        output = self.feed(key)
+        return Output(commit=commit + output.commit, forward=output.forward)
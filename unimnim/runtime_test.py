@@ -0,0 +1,116 @@
+# SPDX-FileCopyrightText: 2025 David Mandelberg <david@mandelberg.org>
+#
+# SPDX-License-Identifier: Apache-2.0
+
+from collections.abc import Mapping, Sequence
+from typing import Any
+
+import pytest
+
+from unimnim import m17n_test
+from unimnim import runtime
+
+_SEARCH_PREFIX_START = (runtime.START_KEY, runtime.START_KEY)
+
+
+def test_trie() -> None:
+    trie = runtime.Trie.build({"a": "b", "ac": "d", "e": "f"})
+
+    a = trie.step(runtime.ROOT, "a")
+    assert a is not None
+    ac = trie.step(a, "c")
+    assert ac is not None
+    assert trie.step(runtime.ROOT, "c") is None
+    assert len(trie) == 4
+    assert trie.prefix(ac) == "ac"
+    assert trie.parent(ac) == a
+    assert trie.result(a) == "b"
+    assert trie.result(runtime.ROOT) is None
+    assert trie.candidates(a) == ("b", "d")
+    assert trie.candidates(runtime.ROOT) == ("b", "d", "f")
+
+
+# TODO: https://github.com/pytest-dev/pytest/issues/9216 - Delete this.
+def _param(
+    id: str,
+    *,
+    map_: Mapping[str, str],
+    keys: Sequence[str],
+    commit: str = "",
+    candidates: Sequence[str] = (),
+    preedit: str = "",
+) -> Any:
+    return pytest.param(
+        map_,
+        keys,
+        commit,
+        candidates,
+        preedit,
+        id=id,
+    )
+
+
+@pytest.mark.parametrize(
+    ",".join(
+        (
+            "map_",
+            "keys",
+            "commit",
+            "candidates",
+            "preedit",
+        )
+    ),
+    (
+        *m17n_test.CASES,
+        # These are runtime-only until they are checked against m17n.
+        _param(
+            "search_prefix_backspace",
+            map_={"a": "b", "aa": "c"},
+            keys=(*_SEARCH_PREFIX_START, "a", "a", runtime.BACKSPACE_KEY),
+            candidates=("b", "c"),
+            preedit="b",
+        ),
+        _param(
+            "search_prefix_backspace_to_start",
+            map_={"a": "b"},
+            keys=(*_SEARCH_PREFIX_START, "a", runtime.BACKSPACE_KEY),
+            preedit=m17n_test.SEARCH_PREFIX_PROMPT,
+        ),
+    ),
+)
+def test_session(
+    map_: Mapping[str, str],
+    keys: Sequence[str],
+    commit: str,
+    candidates: Sequence[str],
+    preedit: str,
+) -> None:
+    session = runtime.Session(
+        runtime.Trie.build(map_),
+        prompt=m17n_test.PROMPT,
+        search_prefix_prompt=m17n_test.SEARCH_PREFIX_PROMPT,
+    )
+
+    actual_commit = []
+    for key in keys:
+        output = session.feed(key)
+        actual_commit.append(output.commit)
+        if output.forward:
+            actual_commit.append(key)
+
+    assert "".join(actual_commit) == commit
+    assert tuple(session.candidates) == tuple(candidates)
+    assert session.preedit == preedit
+
+
+def test_sessions_share_trie() -> None:
+    trie = runtime.Trie.build({"aa": "b"})
+    session_1 = runtime.Session(trie)
+    session_2 = runtime.Session(trie)
+
+    session_1.feed(runtime.START_KEY)
+    session_1.feed("a")
+    session_2.feed(runtime.START_KEY)
+
+    assert session_1.feed("a").commit == "b"
+    assert session_2.preedit == "·"
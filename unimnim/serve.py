@@ -0,0 +1,290 @@
+# SPDX-FileCopyrightText: 2025 David Mandelberg <david@mandelberg.org>
+#
+# SPDX-License-Identifier: Apache-2.0
+"""Daemon that answers lookups over a Unix domain socket.
+
+The protocol is line-delimited JSON: each line from the client is a request
+object, and the server responds to each request with one line containing a
+response object. Requests have an "op" key and op-specific arguments:
+
+    {"op": "exact", "mnemonic": "La'"} -> {"result": "á"}
+    {"op": "prefix", "prefix": "La", "limit": 10}
+        -> {"results": [["La", "a"], ...]}
+    {"op": "reverse", "result": "á"} -> {"mnemonics": ["La'"]}
+    {"op": "search", "query": "small a acute"}
+        -> {"results": [{"result": "á", "mnemonics": ["La'"]}, ...]}
+    {"op": "stats"} -> {"latency": {"exact": {...}, ...}, "reloads": 0}
+
+Errors are returned as {"error": "..."}.
+
+The server reloads when MANIFEST in the output directory changes, once the
+files it lists all match it. Since the manifest is written after the other
+files, the server never mixes files from different builds.
+"""
+
+import asyncio
+from collections.abc import Callable, Mapping, Sequence
+import dataclasses
+import hashlib
+import itertools
+import json
+import logging
+import mmap
+import pathlib
+import time
+from typing import Any, Self
+
+from unimnim import lookup
+from unimnim import name_index
+
+MANIFEST = "serve_manifest.json"
+"""File with the digests of the other files that the server uses."""
+
+_FILES = ("lookup.bin", "reverse_map.json", "name_index.json")
+_DEFAULT_PREFIX_LIMIT = 1000
+
+
+def _digest(contents: bytes | mmap.mmap, /) -> str:
+    return hashlib.sha256(contents).hexdigest()
+
+
+def manifest(output_dir: pathlib.Path) -> Any:
+    """Returns the contents of MANIFEST for the files in output_dir."""
+    return {
+        "files": {
+            file: _digest((output_dir / file).read_bytes()) for file in _FILES
+        }
+    }
+
+
+def _signature(output_dir: pathlib.Path) -> tuple[int, int, int]:
+    """Returns something that changes when MANIFEST changes."""
+    stat = (output_dir / MANIFEST).stat()
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class Index:
+    """Everything needed to answer requests, from one build.
+
+    Attributes:
+        signature: See _signature().
+        lookup: Map and prefix lookups.
+        reverse_map: Map from result to mnemonics.
+        name_index: Index of results by name.
+    """
+
+    signature: tuple[int, int, int]
+    lookup: lookup.Reader
+    reverse_map: Mapping[str, Sequence[str]]
+    name_index: name_index.NameIndex
+
+    @classmethod
+    def load(cls, output_dir: pathlib.Path, /) -> Self:
+        """Loads the index from a directory that was used with --write-all.
+
+        Raises:
+            ValueError: The files don't match MANIFEST, e.g., because a build
+                is writing them.
+        """
+        signature = _signature(output_dir)
+        digests = json.loads((output_dir / MANIFEST).read_text())["files"]
+        with open(output_dir / "lookup.bin", "rb") as lookup_file:
+            lookup_buffer = mmap.mmap(
+                lookup_file.fileno(), 0, access=mmap.ACCESS_READ
+            )
+        reverse_map = (output_dir / "reverse_map.json").read_bytes()
+        name_index_ = (output_dir / "name_index.json").read_bytes()
+        all_contents: tuple[bytes | mmap.mmap, ...] = (
+            lookup_buffer,
+            reverse_map,
+            name_index_,
+        )
+        for file, contents in zip(_FILES, all_contents, strict=True):
+            if _digest(contents) != digests.get(file):
+                raise ValueError(f"{file} does not match {MANIFEST}")
+        return cls(
+            signature=signature,
+            lookup=lookup.Reader(lookup_buffer),
+            reverse_map=json.loads(reverse_map),
+            name_index=name_index.NameIndex.from_json(json.loads(name_index_)),
+        )
+
+
+def _str_arg(request: Any, key: str) -> str:
+    """Returns a string argument from a request."""
+    value = request[key]
+    if not isinstance(value, str):
+        raise TypeError(f"{key!r} must be a string, not {value!r}")
+    return value
+
+
+@dataclasses.dataclass(kw_only=True)
+class _Latency:
+    count: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+    def to_json(self) -> Any:
+        return dict(
+            count=self.count,
+            total_seconds=self.total_seconds,
+            mean_seconds=self.total_seconds / self.count if self.count else 0,
+            max_seconds=self.max_seconds,
+        )
+
+
+class Server:
+    """Answers requests, and reloads when the output files change."""
+
+    def __init__(self, output_dir: pathlib.Path) -> None:
+        """Initializer.
+
+        Args:
+            output_dir: Directory that was used with --write-all.
+        """
+        self._output_dir = output_dir
+        self._index = Index.load(output_dir)
+        self._latency = dict[str, _Latency]()
+        self._reloads = 0
+        self._handlers: Mapping[str, Callable[[Index, Any], Any]] = {
+            "exact": self._exact,
+            "prefix": self._prefix,
+            "reverse": self._reverse,
+            "search": self._search,
+            "stats": self._stats,
+        }
+
+    async def reload_if_changed(self) -> bool:
+        """Reloads the index if the files changed, and returns if it did.
+
+        If the files can't be loaded, e.g., because a build is writing them,
+        this keeps using the old index and tries again next time.
+        """
+        try:
+            if _signature(self._output_dir) == self._index.signature:
+                return False
+            index = await asyncio.to_thread(Index.load, self._output_dir)
+        except (OSError, ValueError):
+            logging.exception("Failed to reload from %s", self._output_dir)
+            return False
+        # Requests in progress keep using the index they started with, since
+        # handlers get the index as an argument.
+        self._index = index
+        self._reloads += 1
+        return True
+
+    async def watch(self, *, interval: float) -> None:
+        """Calls reload_if_changed() every interval seconds, forever."""
+        while True:
+            await asyncio.sleep(interval)
+            await self.reload_if_changed()
+
+    def _exact(self, index: Index, request: Any) -> Any:
+        return {"result": index.lookup.get(_str_arg(request, "mnemonic"))}
+
+    def _prefix(self, index: Index, request: Any) -> Any:
+        return {
+            "results": [
+                list(item)
+                for item in itertools.islice(
+                    index.lookup.prefix(_str_arg(request, "prefix")),
+                    request.get("limit", _DEFAULT_PREFIX_LIMIT),
+                )
+            ]
+        }
+
+    def _reverse(self, index: Index, request: Any) -> Any:
+        return {
+            "mnemonics": index.reverse_map.get(_str_arg(request, "result"), [])
+        }
+
+    def _search(self, index: Index, request: Any) -> Any:
+        return {
+            "results": [
+                {"result": result, "mnemonics": index.reverse_map[result]}
+                for result in index.name_index.search(
+                    _str_arg(request, "query")
+                )
+            ]
+        }
+
+    def _stats(self, index: Index, request: Any) -> Any:
+        del index, request  # Unused.
+        return {
+            "latency": {
+                op: latency.to_json()
+                for op, latency in sorted(self._latency.items())
+            },
+            "reloads": self._reloads,
+        }
+
+    def handle(self, request: Any) -> Any:
+        """Returns the response to a request."""
+        start = time.perf_counter()
+        try:
+            op = request["op"]
+            handler = self._handlers[op]
+        except (KeyError, TypeError):
+            return {"error": f"Invalid op in request: {request!r}"}
+        try:
+            response = handler(self._index, request)
+        except (KeyError, TypeError, ValueError) as e:
+            response = {"error": f"Invalid request {request!r}: {e!r}"}
+        self._latency.setdefault(op, _Latency()).add(
+            time.perf_counter() - start
+        )
+        return response
+
+    async def handle_connection(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> None:
+        """Handles requests from one client until it disconnects."""
+        try:
+            while line := await reader.readline():
+                try:
+                    request = json.loads(line)
+                except ValueError as e:
+                    response = {"error": f"Invalid JSON: {e}"}
+                else:
+                    response = self.handle(request)
+                writer.write(
+                    json.dumps(response, ensure_ascii=False).encode() + b"\n"
+                )
+                await writer.drain()
+        finally:
+            writer.close()
+
+
+async def serve(
+    *,
+    socket_path: pathlib.Path,
+    output_dir: pathlib.Path,
+    reload_interval: float = 1.0,
+    started: Callable[[], None] | None = None,
+) -> None:
+    """Serves forever.
+
+    Args:
+        socket_path: Unix domain socket to listen on.
+        output_dir: Directory that was used with --write-all.
+        reload_interval: How often to check for changes to the output files, in
+            seconds.
+        started: Called once the server is listening.
+    """
+    server = Server(output_dir)
+    async with await asyncio.start_unix_server(
+        server.handle_connection, path=socket_path
+    ) as unix_server:
+        if started is not None:
+            started()
+        async with asyncio.TaskGroup() as task_group:
+            task_group.create_task(server.watch(interval=reload_interval))
+            task_group.create_task(unix_server.serve_forever())
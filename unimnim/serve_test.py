@@ -0,0 +1,213 @@
+# SPDX-FileCopyrightText: 2025 David Mandelberg <david@mandelberg.org>
+#
+# SPDX-License-Identifier: Apache-2.0
+
+import asyncio
+from collections.abc import Mapping
+import json
+import os
+import pathlib
+from typing import Any
+
+import pytest
+
+from unimnim import input_method
+from unimnim import lookup
+from unimnim import name_index
+from unimnim import serve
+
+
+def _write_output(output_dir: pathlib.Path, map_: Mapping[str, str]) -> None:
+    sorted_map = dict(sorted(map_.items(), key=lambda kv: (kv[1], kv[0])))
+    reverse_map = input_method.generate_reverse_map(sorted_map)
+    (output_dir / "lookup.bin").write_bytes(lookup.serialize(sorted_map))
+    (output_dir / "reverse_map.json").write_text(json.dumps(reverse_map))
+    (output_dir / "name_index.json").write_text(
+        json.dumps(name_index.NameIndex.build(reverse_map).to_json())
+    )
+    (output_dir / serve.MANIFEST).write_text(
+        json.dumps(serve.manifest(output_dir))
+    )
+
+
+_MAP = {
+    "a": "a",
+    "a'": "\N{LATIN SMALL LETTER A WITH ACUTE}",
+    "aa": "\N{LATIN SMALL LETTER A WITH ACUTE}",
+    "b": "b",
+}
+
+
+@pytest.mark.parametrize(
+    "request_,expected",
+    (
+        (
+            {"op": "exact", "mnemonic": "a'"},
+            {"result": "\N{LATIN SMALL LETTER A WITH ACUTE}"},
+        ),
+        ({"op": "exact", "mnemonic": "c"}, {"result": None}),
+        (
+            {"op": "prefix", "prefix": "a"},
+            {
+                "results": [
+                    ["a", "a"],
+                    ["a'", "\N{LATIN SMALL LETTER A WITH ACUTE}"],
+                    ["aa", "\N{LATIN SMALL LETTER A WITH ACUTE}"],
+                ],
+            },
+        ),
+        (
+            {"op": "prefix", "prefix": "a", "limit": 1},
+            {"results": [["a", "a"]]},
+        ),
+        (
+            {"op": "reverse", "result": "\N{LATIN SMALL LETTER A WITH ACUTE}"},
+            {"mnemonics": ["a'", "aa"]},
+        ),
+        ({"op": "reverse", "result": "c"}, {"mnemonics": []}),
+        (
+            {"op": "search", "query": "acute"},
+            {
+                "results": [
+                    {
+                        "result": "\N{LATIN SMALL LETTER A WITH ACUTE}",
+                        "mnemonics": ["a'", "aa"],
+                    },
+                ],
+            },
+        ),
+    ),
+)
+def test_handle(
+    request_: Any,
+    expected: Any,
+    tmp_path: pathlib.Path,
+) -> None:
+    _write_output(tmp_path, _MAP)
+    server = serve.Server(tmp_path)
+
+    assert server.handle(request_) == expected
+
+
+@pytest.mark.parametrize(
+    "request_,error_regex",
+    (
+        ([], "Invalid op"),
+        ({}, "Invalid op"),
+        ({"op": "not-an-op"}, "Invalid op"),
+        ({"op": "exact"}, "Invalid request"),
+        ({"op": "exact", "mnemonic": 1}, "must be a string"),
+        ({"op": "prefix", "prefix": None}, "must be a string"),
+        ({"op": "prefix", "prefix": "a", "limit": "1"}, "Invalid request"),
+        ({"op": "reverse", "result": ["a"]}, "must be a string"),
+        ({"op": "search", "query": 5}, "must be a string"),
+    ),
+)
+def test_handle_error(
+    request_: Any,
+    error_regex: str,
+    tmp_path: pathlib.Path,
+) -> None:
+    _write_output(tmp_path, _MAP)
+    server = serve.Server(tmp_path)
+
+    response = server.handle(request_)
+
+    assert response.keys() == {"error"}
+    assert error_regex in response["error"]
+
+
+def test_stats(tmp_path: pathlib.Path) -> None:
+    _write_output(tmp_path, _MAP)
+    server = serve.Server(tmp_path)
+
+    server.handle({"op": "exact", "mnemonic": "a"})
+    server.handle({"op": "exact", "mnemonic": "b"})
+    stats = server.handle({"op": "stats"})
+
+    assert stats["latency"]["exact"]["count"] == 2
+    assert stats["reloads"] == 0
+
+
+def test_reload_if_changed(tmp_path: pathlib.Path) -> None:
+    _write_output(tmp_path, _MAP)
+    server = serve.Server(tmp_path)
+
+    unchanged = asyncio.run(server.reload_if_changed())
+    _write_output(tmp_path, {"c": "c"})
+    # Make sure the change is visible even with coarse mtimes.
+    os.utime(tmp_path / serve.MANIFEST, ns=(0, 0))
+    changed = asyncio.run(server.reload_if_changed())
+
+    assert not unchanged
+    assert changed
+    assert server.handle({"op": "exact", "mnemonic": "c"}) == {"result": "c"}
+    assert server.handle({"op": "exact", "mnemonic": "a"}) == {"result": None}
+
+
+def test_reload_if_changed_keeps_old_index_on_error(
+    tmp_path: pathlib.Path,
+) -> None:
+    _write_output(tmp_path, _MAP)
+    server = serve.Server(tmp_path)
+
+    (tmp_path / "name_index.json").write_text("not json")
+    (tmp_path / serve.MANIFEST).write_text(json.dumps(serve.manifest(tmp_path)))
+    reloaded = asyncio.run(server.reload_if_changed())
+
+    assert not reloaded
+    assert server.handle({"op": "exact", "mnemonic": "a"}) == {"result": "a"}
+
+
+def test_reload_if_changed_waits_for_matching_files(
+    tmp_path: pathlib.Path,
+) -> None:
+    _write_output(tmp_path, _MAP)
+    server = serve.Server(tmp_path)
+    old_reverse_map = (tmp_path / "reverse_map.json").read_bytes()
+
+    # A build is in progress: the manifest and lookup.bin are new, but
+    # reverse_map.json isn't yet.
+    _write_output(tmp_path, {"c": "c"})
+    (tmp_path / "reverse_map.json").write_bytes(old_reverse_map)
+    os.utime(tmp_path / serve.MANIFEST, ns=(0, 0))
+    in_progress = asyncio.run(server.reload_if_changed())
+    _write_output(tmp_path, {"c": "c"})
+    done = asyncio.run(server.reload_if_changed())
+
+    assert not in_progress
+    assert done
+    assert server.handle({"op": "search", "query": "c"}) == {
+        "results": [{"result": "c", "mnemonics": ["c"]}]
+    }
+
+
+def test_serve(tmp_path: pathlib.Path) -> None:
+    _write_output(tmp_path, _MAP)
+    socket_path = tmp_path / "socket"
+
+    async def _test() -> list[Any]:
+        started = asyncio.Event()
+        server_task = asyncio.create_task(
+            serve.serve(
+                socket_path=socket_path,
+                output_dir=tmp_path,
+                started=started.set,
+            )
+        )
+        await started.wait()
+        reader, writer = await asyncio.open_unix_connection(socket_path)
+        writer.write(b'{"op": "exact", "mnemonic": "a\'"}\n')
+        writer.write(b"not json\n")
+        await writer.drain()
+        responses = [json.loads(await reader.readline()) for _ in range(2)]
+        writer.close()
+        server_task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await server_task
+        return responses
+
+    responses = asyncio.run(_test())
+
+    assert responses[0] == {"result": "\N{LATIN SMALL LETTER A WITH ACUTE}"}
+    assert "Invalid JSON" in responses[1]["error"]